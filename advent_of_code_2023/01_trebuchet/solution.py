@@ -1,20 +1,22 @@
-def load_file() -> list[str]:
-    # Load file from disk
-    with open("input.txt", "rb") as f:
-        lines = f.readlines()
-        return [line.decode("utf-8").strip() for line in lines]
+import hashlib
+import logging
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator, Self
 
+from advent_of_code_2023.char_classes import DIGIT, classify, find_digit, rfind_digit
+from advent_of_code_2023.input_reader import BufferT, is_buffer, line_offsets, map_file, read_lines
+from advent_of_code_2023.instrumentation import counted, stage
 
-input_elf_document = load_file()
+logger = logging.getLogger(__name__)
 
+INPUT_PATH = Path(__file__).parent / "input.txt"
 
-def is_int(char: str) -> bool:
-    try:
-        int(char)
-        return True
-    except ValueError:
-        return False
+# Every line is solved on its own - input can be split between processes
+LINE_INDEPENDENT = True
 
+ZERO = ord("0")
 
 word_num_map = {
     "one": 1,
@@ -47,106 +49,396 @@ input_anything = [
 ]
 
 
-def first_int_from_left(composed: str) -> str:
-    for char in composed:
-        if is_int(char):
-            return char
+class DigitMatcher:
+    """
+    Multi-pattern matcher (Aho-Corasick automaton) compiled once from a word:num table plus the digits.
+
+    Two automatons are built - one for the words and one for the reversed words.
+    - First calibration digit: forward scan, the match STARTING first wins.
+    - Last calibration digit: reverse scan, the match STARTING last wins = the first one found.
 
+    Overlapping words share letters, both are found:
+      eightwo = 8 on index 0, 2 on index 4 -> 82
+      oneight = 1 on index 0, 8 on index 2 -> 18
 
-def first_int_from_right(composed: str) -> str:
-    for char in reversed(composed):
-        if is_int(char):
-            return char
+    If two words start on the same index, the later one in the table wins.
+
+    Without words (digits only) the automatons are skipped - the first and last digit are found on the classified
+    line by bytes.find/rfind:
+      abc123sevenineight4569ee -> sssdddssssssssssssddddss -> 1 on index 3, 9 on index 21
+    """
 
+    @stage("trebuchet.index")
+    def __init__(self, word_table: dict[str, int] | None = None):
+        if word_table is None:
+            word_table = word_num_map
+
+        patterns = {str(digit): digit for digit in range(10)}
+        patterns.update(word_table)
+        self.has_words = bool(word_table)
+        self.max_length = max(len(pattern) for pattern in patterns)
+        self.max_bytes_length = max(len(pattern.encode()) for pattern in patterns)
+        # Same table (order included) = same results. Used to key cached results.
+        self.fingerprint = hashlib.sha256(repr(list(patterns.items())).encode()).hexdigest()[:16]
+
+        # Priority - position in the table. Higher wins on the same index.
+        entries = [(pattern, num, priority) for priority, (pattern, num) in enumerate(patterns.items())]
+        self.forward = self._compile(entries)
+        self.backward = self._compile([(pattern[::-1], num, priority) for pattern, num, priority in entries])
+
+        # Buffers are scanned byte by byte - same automatons compiled from UTF-8 encoded patterns
+        byte_entries = [(pattern.encode(), num, priority) for pattern, num, priority in entries]
+        self.forward_bytes = self._compile(byte_entries)
+        self.backward_bytes = self._compile([(pattern[::-1], num, priority) for pattern, num, priority in byte_entries])
+
+    @staticmethod
+    def _compile(entries: list[tuple[str | bytes, int, int]]):
+        """
+        Build a complete transition table (goto + failure links resolved) for every state.
+
+        Transitions are keyed by chars of str patterns or by byte values of bytes patterns.
+        Output of the state is a list of (length, num, priority) for every pattern ending in the state.
+        """
+        transitions: list[dict[str | int, int]] = [{}]
+        outputs: list[list[tuple[int, int, int]]] = [[]]
+
+        for pattern, num, priority in entries:
+            state = 0
+            for char in pattern:
+                if char not in transitions[state]:
+                    transitions.append({})
+                    outputs.append([])
+                    transitions[state][char] = len(transitions) - 1
+                state = transitions[state][char]
+            outputs[state].append((len(pattern), num, priority))
+
+        alphabet = {char for pattern, _, _ in entries for char in pattern}
+        failure = [0] * len(transitions)
+        queue = list(transitions[0].values())
+        # Breadth first - failure state of every node is resolved before its children.
+        for state in queue:
+            outputs[state].extend(outputs[failure[state]])
+            for char in alphabet:
+                child = transitions[state].get(char)
+                if child is None:
+                    if state:
+                        transitions[state][char] = transitions[failure[state]].get(char, 0)
+                    continue
+                failure[child] = transitions[failure[state]].get(char, 0) if state else 0
+                queue.append(child)
+
+        return transitions, outputs
+
+    @counted
+    def first(self, line: str, classes: bytes | None = None) -> int | None:
+        """Num of the match starting first from the left. Classes of the line are computed when not given."""
+        if self.has_words:
+            return self.scan_first(line)
+
+        first_digit = (classes if classes is not None else classify(line)).find(DIGIT)
+        return int(line[first_digit]) if first_digit != -1 else None
+
+    @counted
+    def last(self, line: str, classes: bytes | None = None) -> int | None:
+        """Num of the match starting last from the left. Classes of the line are computed when not given."""
+        if self.has_words:
+            return self.scan_last(line)
+
+        last_digit = (classes if classes is not None else classify(line)).rfind(DIGIT)
+        return int(line[last_digit]) if last_digit != -1 else None
+
+    @counted
+    def first_in(self, buffer: BufferT, start: int, end: int) -> int | None:
+        """first() of buffer[start:end] - the line is not copied"""
+        if self.has_words:
+            return self.scan_first(buffer, start=start, end=end)
+
+        first_digit = find_digit(buffer, start, end)
+        return buffer[first_digit] - ZERO if first_digit != -1 else None
+
+    @counted
+    def last_in(self, buffer: BufferT, start: int, end: int) -> int | None:
+        """last() of buffer[start:end] - the line is not copied"""
+        if self.has_words:
+            return self.scan_last(buffer, start=start, end=end)
+
+        last_digit = rfind_digit(buffer, start, end)
+        return buffer[last_digit] - ZERO if last_digit != -1 else None
+
+    def scan_first(self, line: str | BufferT, start: int = 0, end: int | None = None) -> int | None:
+        """Forward automaton scan of line[start:end] - the match starting first wins"""
+        is_str = isinstance(line, str)
+        transitions, outputs = self.forward if is_str else self.forward_bytes
+        max_length = self.max_length if is_str else self.max_bytes_length
+        state = 0
+        best: tuple[int, int, int] | None = None  # start index, -priority, num
+
+        for index in range(start, len(line) if end is None else end):
+            char = line[index]
+            # No pattern starting on best index or before can end here
+            if best is not None and index - max_length >= best[0]:
+                break
+
+            state = transitions[state].get(char, 0)
+            for length, num, priority in outputs[state]:
+                candidate = (index - length + 1, -priority, num)
+                if best is None or candidate < best:
+                    best = candidate
+
+        return best[2] if best is not None else None
+
+    def scan_last(self, line: str | BufferT, start: int = 0, end: int | None = None) -> int | None:
+        """Reverse automaton scan of line[start:end] - the first match found wins"""
+        transitions, outputs = self.backward if isinstance(line, str) else self.backward_bytes
+        state = 0
+
+        for index in range((len(line) if end is None else end) - 1, start - 1, -1):
+            state = transitions[state].get(line[index], 0)
+            if outputs[state]:
+                _, num, _ = max(outputs[state], key=lambda output: output[2])
+                return num
+
+        return None
+
+
+def combine(left: int, right: int) -> int:
+    """
+    First digit of the left NUM and last digit of the right NUM - NUMs of custom tables might have more digits.
 
-def combine_left_right(composed: str):
-    left = first_int_from_left(composed)
-    right = first_int_from_right(composed)
-    combined = int(str(left) + str(right))
-    return combined
+    Example: ten (10) ... eleven (11) -> 1 + 1 = 11
+    """
+    return int(str(left)[0]) * 10 + right % 10
 
 
-def find_occurrence(line: str, word: str, start_index: int):
-    """Find an occurrence of a given word starting from the given index from the left
+@counted
+def calibration_value(line: str, matcher: DigitMatcher) -> int:
+    """
+    Combine first NUM and last NUM
 
-    Example: abc123sevenineight4569ee = word "seven" starts at index 6
+    Example: abc123sevenineight4569ee -> 1 + 9 = 19
     """
-    # print(f"Looking for {word} in {line} starting index {start_index}")
-    found_index = line.find(word, start_index)
-    return found_index
+    # Digits only - line is classified once for both ends
+    classes = None if matcher.has_words else classify(line)
+    left = matcher.first(line, classes=classes)
+    right = matcher.last(line, classes=classes)
+    return combine(left, right)
 
 
-def localize_words(messed: str):
+class CalibrationCache:
     """
-    Iterate over word:num map and find index of the first letter for each word.
-    If the word is if found, set last_index to it's first letter index to avoid finding it again.
-    Iterate until there is no index found = no more word from word:num mapping present.
+    Bounded LRU cache of calibration values keyed by line content (and the matcher used).
 
-    Return dict with location of all WORDS
+    Optionally backed by SQLite file keyed by line hash - lines seen in previous batches are not computed again.
+    Least recently used lines are evicted from memory when the cache is full. Disk store keeps everything.
+    Disk writes are committed every COMMIT_EVERY puts and on close - a crash loses at most one batch.
 
-    Exmaple:
-      abc123sevenineight4569ee = {6: 7, 13: 8, 10: 9}
-        > "seven" on index 6
-        > "eight" on index 13
-        > "nine" on index 10
+    Example:
+        with CalibrationCache(maxsize=100_000, path="calibration.sqlite") as cache:
+            sum_calibration_values(lines, matcher=DigitMatcher(), cache=cache)
+            print(cache.stats())
     """
-    word_locations: dict[int, int] = {}
 
-    for word, num in word_num_map.items():
-        last_index_found = -1
-        found_index = find_occurrence(messed, word, start_index=last_index_found + 1)
-        # ...until found
-        while found_index > -1:
-            word_locations.update({found_index: num})
-            last_index_found = found_index
-            found_index = find_occurrence(
-                messed, word, start_index=last_index_found + 1
+    # Puts written to SQLite in one transaction
+    COMMIT_EVERY = 10_000
+
+    def __init__(self, maxsize: int = 100_000, path: str | Path | None = None):
+        if maxsize < 1:
+            raise ValueError(f"Cache size has to be at least 1, got {maxsize}")
+
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncommitted = 0
+
+        self.connection: sqlite3.Connection | None = None
+        if path is not None:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS calibration (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    def disk_key(fingerprint: str, line: str) -> str:
+        return hashlib.sha256(f"{fingerprint}:{line}".encode()).hexdigest()
+
+    def get(self, line: str, matcher: DigitMatcher) -> int | None:
+        key = (matcher.fingerprint, line)
+        # Calibration value might be 0 - membership is tested, not the value
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        if self.connection is not None:
+            row = self.connection.execute(
+                "SELECT value FROM calibration WHERE key = ?", (self.disk_key(*key),)
+            ).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                self._remember(key, row[0])
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, line: str, matcher: DigitMatcher, value: int) -> None:
+        key = (matcher.fingerprint, line)
+        self._remember(key, value)
+        if self.connection is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO calibration (key, value) VALUES (?, ?)", (self.disk_key(*key), value)
             )
+            self.uncommitted += 1
+            if self.uncommitted >= self.COMMIT_EVERY:
+                self.commit()
+
+    def _remember(self, key: tuple[str, str], value: int) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def commit(self) -> None:
+        if self.connection is not None:
+            self.connection.commit()
+            self.uncommitted = 0
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.commit()
+            self.connection.close()
+            self.connection = None
+
+
+def sum_calibration_values(
+    lines: Iterable[str], matcher: DigitMatcher, cache: CalibrationCache | None = None
+) -> int:
+    """
+    Run above methods in order.
+    - Find first and last NUM (digit or WORD) in messed lines.
+    - combine first NUM and last NUM
+    - SUM values
+
+    Lines are looked up in the cache first when given.
+    """
+    sum_all = 0
+    for i, line in enumerate(lines):
+        combined_left_right = cache.get(line, matcher) if cache is not None else None
+        if combined_left_right is None:
+            combined_left_right = calibration_value(line=line, matcher=matcher)
+            if cache is not None:
+                cache.put(line, matcher, combined_left_right)
+
+        logger.debug("%s - %s combined_left_right: %s", i, line, combined_left_right)
+        sum_all += combined_left_right
+
+    return sum_all
+
+
+def sum_buffer_calibration_values(buffer: BufferT, matcher: DigitMatcher) -> int:
+    """
+    sum_calibration_values of the whole input in one buffer (bytes, memoryview, mmap...).
+
+    Lines are only (start, end) offsets - no str is created per line.
+    """
+    sum_all = 0
+    for start, end in line_offsets(buffer):
+        sum_all += combine(matcher.first_in(buffer, start, end), matcher.last_in(buffer, start, end))
+
+    return sum_all
+
+
+def sum_document(document: Iterable[str] | BufferT, matcher: DigitMatcher, cache: CalibrationCache | None) -> int:
+    if not is_buffer(document):
+        return sum_calibration_values(lines=document, matcher=matcher, cache=cache)
 
-    return word_locations
+    if cache is not None:
+        raise ValueError("Calibration cache is keyed by str lines, it can't be used with a buffer")
+    return sum_buffer_calibration_values(buffer=document, matcher=matcher)
 
 
-def compose(line: str, localized: dict[int, int]):
+class CalibrationStream:
     """
-    Compose new string with inplace injection of NUM before WORD
+    Online evaluator - lines are fed one by one, calibration sums of both parts are running totals.
+
+    Example:
+        stream = CalibrationStream()
+        for line in read_lines(INPUT_PATH):
+            stream.feed_line(line)
+        stream.totals()  # {"part one": 54667, "part two": 54203}
+    """
+
+    def __init__(self):
+        self.digits_matcher = DigitMatcher(word_table={})
+        self.words_matcher = DigitMatcher()
+        self.digits_sum = 0
+        self.words_sum = 0
+
+    def feed_line(self, line: str) -> None:
+        self.digits_sum += calibration_value(line=line, matcher=self.digits_matcher)
+        self.words_sum += calibration_value(line=line, matcher=self.words_matcher)
 
-    Example;
-      abc123sevenineight4569ee = {6: 7, 13: 8, 10: 9}
-        > "seven" on index 6
-        > "eight" on index 13
-        > "nine" on index 10
+    def totals(self) -> dict[str, int]:
+        return {"part one": self.digits_sum, "part two": self.words_sum}
 
-    Composed new string: abc1237seve9nin8eight4569ee
+
+def stream_solver() -> CalibrationStream:
+    return CalibrationStream()
+
+
+@stage("trebuchet.parse")
+def parse(lines: Iterable[str]) -> Iterable[str]:
+    """
+    Lines are independent - nothing is kept between them.
+
+    Re-iterable lines (LineSource reading the file again, list) are kept as they are, every part reads them
+    on its own. One-shot iterators (stdin) are collected - both parts need them.
     """
-    composed = []
-    for char_index, char in enumerate(line):
-        if char_index in localized.keys():
-            composed.append(str(localized[char_index]))
+    if isinstance(lines, Iterator):
+        return list(lines)
+    return lines
+
+
+@stage("trebuchet.parse")
+def parse_buffer(buffer: BufferT) -> BufferT:
+    """Nothing to parse - lines are found while solving"""
+    return buffer
+
 
-        composed.append(str(char))
+@stage("trebuchet.solve")
+def part_one(document: Iterable[str] | BufferT, cache: CalibrationCache | None = None) -> int:
+    """Digits only"""
+    return sum_document(document=document, matcher=DigitMatcher(word_table={}), cache=cache)
 
-    return composed
 
+@stage("trebuchet.solve")
+def part_two(document: Iterable[str] | BufferT, cache: CalibrationCache | None = None) -> int:
+    """Digits and WORDS"""
+    return sum_document(document=document, matcher=DigitMatcher(), cache=cache)
 
-"""
-Run above methods in order.
-- Localize every occurrence of WORD number representation in messed lines.
-- compose new string with NUM injection
-- combine first NUM and last NUM
-- SUM values
-"""
-sum_all = []
-for i, line in enumerate(input_elf_document):
-    print(i, " - ", line)
 
-    localized: dict[int:str] = localize_words(line)
-    print("localized (index:number):", localized)
-    composed = compose(line=line, localized=localized)
-    composed_string = "".join(composed)
-    print("composed", composed_string)
-    combined_left_right = combine_left_right(composed_string)
-    print("combined_left_right", combined_left_right)
-    sum_all.append(int(combined_left_right))
-    print("-----")
+if __name__ == "__main__":
+    print(sum_calibration_values(lines=read_lines(INPUT_PATH), matcher=DigitMatcher()))
 
-print(sum(sum_all))
+    with map_file(INPUT_PATH) as mapped_input:
+        print(sum_buffer_calibration_values(buffer=mapped_input, matcher=DigitMatcher()))
@@ -3,23 +3,33 @@ Part 1: 2720
 Part 2: 71535
 """
 
-from typing import Literal, Self
+import logging
+from math import isqrt
+from pathlib import Path
+from typing import Iterable, Iterator, Literal, Self
 import re
-from functools import reduce
+from functools import cache, reduce
 from operator import mul
 
+from advent_of_code_2023.input_reader import read_lines
+from advent_of_code_2023.instrumentation import counted, stage
+
 
 CubeColorT = Literal["red", "green", "blue"]
+COLORS: tuple[CubeColorT, ...] = ("red", "green", "blue")
+COLOR_INDEX: dict[str, int] = {color: index for index, color in enumerate(COLORS)}
+GameTokenT = tuple[int, int, CubeColorT, int]  # (game_id, set_index, color, count)
 
+logger = logging.getLogger(__name__)
 
-def load_file() -> list[str]:
-    # Load file from disk
-    with open("input.txt", "rb") as f:
-        lines = f.readlines()
-        return [line.decode("utf-8").strip() for line in lines]
+INPUT_PATH = Path(__file__).parent / "input.txt"
 
+# Every game is solved on its own - input can be split between processes
+LINE_INDEPENDENT = True
+# Malformed records are reported by line number - parse takes the number of the first line
+LINE_NUMBERS = True
 
-input_all_games = load_file()
+BAG_RULES: dict[CubeColorT, int] = {"red": 12, "green": 13, "blue": 14}
 
 input_web_example = [
     "Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green",
@@ -31,34 +41,36 @@ input_web_example = [
 
 
 class ReprMixin:
-    def __repr__(self):
-        return f"{self.__class__.__name__}({self.__dict__})"
+    """Repr of __slots__ attributes, same shape as the instance dict: GameSet({'revealed_order': 0, ...})"""
 
+    __slots__ = ()
 
-class Cube(ReprMixin):
-    def __init__(self, color: CubeColorT):
-        self.color = color
+    def __repr__(self):
+        attributes = {name: getattr(self, name) for name in self.__slots__}
+        return f"{self.__class__.__name__}({attributes})"
 
 
 class GameSet(ReprMixin):
+    __slots__ = ("revealed_order", "counts")
+
     def __init__(self, revealed_order: int):
         self.revealed_order = revealed_order
-        self.cubes: list[Cube] = []
+        # Number of revealed cubes per color. Index is position of the color in COLORS.
+        self.counts: list[int] = [0] * len(COLORS)
 
-    def add_cube(self, cube: Cube) -> None:
-        self.cubes.append(cube)
-
-    def extend_cubes(self, cubes: list[Cube]):
-        self.cubes.extend(cubes)
-
-    def cubes(self, color: CubeColorT) -> list[Cube]:
-        return [cube for cube in self.cubes if cube.color == color]
+    def add_cubes(self, color: CubeColorT, count: int) -> None:
+        try:
+            self.counts[COLOR_INDEX[color]] += count
+        except KeyError:
+            raise ValueError(f"Unknown cube color {color!r}, expected one of {COLORS}") from None
 
     def cubes_sum(self, color: CubeColorT) -> int:
-        return len([cube for cube in self.cubes if cube.color == color])
+        return self.counts[COLOR_INDEX[color]]
 
 
 class CubeGame(ReprMixin):
+    __slots__ = ("game_number", "game_sets")
+
     def __init__(self, game_number: int):
         self.game_number = game_number
         self.game_sets: list[GameSet] = []
@@ -72,9 +84,9 @@ class CubeGame(ReprMixin):
     def add_set(self, game_set: GameSet) -> None:
         self.game_sets.append(game_set)
 
-    def revealed_cubes(self, color: CubeColorT):
-        """Revealed Cubes by color for the entire game - in every GameSet"""
-        return [game_set.cubes(color=color) for game_set in self.game_sets]
+    def revealed_cubes(self, color: CubeColorT) -> list[int]:
+        """Revealed Cubes count by color for the entire game - in every GameSet"""
+        return [game_set.cubes_sum(color=color) for game_set in self.game_sets]
 
     def minimum_cubes_per_color(self, colors: list[CubeColorT]):
         """
@@ -93,46 +105,97 @@ class CubeGame(ReprMixin):
 
         return result
 
+    def color_maxima(self) -> list[int]:
+        """Highest count of every color in any set. Index is position of the color in COLORS."""
+        maxima = [0] * len(COLORS)
+        for game_set in self.game_sets:
+            maxima = [max(highest, count) for highest, count in zip(maxima, game_set.counts)]
+        return maxima
+
+
+class GameRecordError(ValueError):
+    def __init__(self, message: str, line_number: int, column: int):
+        super().__init__(f"Malformed game record on line {line_number}, column {column}: {message}")
+        self.message = message
+        self.line_number = line_number
+        self.column = column
+
+    def __reduce__(self):
+        # Raised in parallel workers - pickled back to the parent with all its arguments
+        return type(self), (self.message, self.line_number, self.column)
+
+
+GAME_ID_PATTERN = re.compile(r"\s*Game\s+(\d+)\s*:")
+CUBES_PATTERN = re.compile(r"\s*(\d+)\s+(\w+)\s*([,;]|$)")
+
+
+@counted
+def tokenize_game_record(game_record: str, line_number: int = 1) -> Iterator[GameTokenT]:
+    """
+    Walk the record once, token after token, with precompiled patterns anchored on the current position.
+
+    Example: Game 3: 8 green, 6 blue; 5 blue
+      > (3, 0, "green", 8)
+      > (3, 0, "blue", 6)
+      > (3, 1, "blue", 5)
+    """
+    match = GAME_ID_PATTERN.match(game_record)
+    if match is None:
+        raise GameRecordError("expected 'Game <id>:'", line_number=line_number, column=1)
+
+    game_id = int(match[1])
+    position = match.end()
+    set_index = 0
+
+    while True:
+        match = CUBES_PATTERN.match(game_record, position)
+        if match is None:
+            raise GameRecordError("expected '<count> <color>'", line_number=line_number, column=position + 1)
+
+        cubes_count, cube_color, separator = match.groups()
+        if cube_color not in COLOR_INDEX:
+            raise GameRecordError(
+                f"unknown cube color {cube_color!r}", line_number=line_number, column=match.start(2) + 1
+            )
 
-def game_factory(game_record: str) -> CubeGame:
-    # print("game_record", game_record)
-    right_game, left_sets = re.split(":", game_record)
+        yield game_id, set_index, cube_color, int(cubes_count)
 
-    game_number = re.sub("Game", "", right_game).strip()
-    # print("game_number", game_number)
-    new_game = CubeGame(game_number=int(game_number))
+        # End of the record
+        if not separator:
+            return
 
-    game_set_list = list(map(lambda item: item.strip(), re.split(";", left_sets)))
-    # print("game_set_list", game_set_list)
+        if separator == ";":
+            set_index += 1
+        position = match.end()
 
-    for set_index, game_set in enumerate(game_set_list):
-        new_set = GameSet(revealed_order=set_index)
-        new_game.add_set(game_set=new_set)
-        cube_list = list(map(lambda item: item.strip(), re.split(",", game_set)))
-        # print("cube_list", cube_list)
-        for cube in cube_list:
-            # print("cube", cube)
-            cubes_count, cube_color = re.split(" ", cube)
-            # print("cubes_count", cubes_count, "cube_color", cube_color)
-            new_cubes = [Cube(color=cube_color) for _ in range(int(cubes_count))]
-            # print("new_cubes", new_cubes)
-            new_set.extend_cubes(cubes=new_cubes)
 
-    return new_game
+def game_factory(game_record: str, line_number: int = 1) -> CubeGame:
+    new_game = None
+
+    for game_id, set_index, cube_color, cubes_count in tokenize_game_record(game_record, line_number=line_number):
+        if new_game is None:
+            new_game = CubeGame(game_number=game_id)
 
+        # Next set revealed
+        if set_index == len(new_game.game_sets):
+            new_game.add_set(game_set=GameSet(revealed_order=set_index))
 
-def normalized_games(game_records: list[str]):
-    return [game_factory(game_record=game_record) for game_record in game_records]
+        new_game.game_sets[set_index].add_cubes(color=cube_color, count=cubes_count)
+
+    return new_game
 
 
-game_list_all = normalized_games(input_all_games)
-game_list_web_example = normalized_games(input_web_example)
+def normalized_games(game_records: Iterable[str], first_line_number: int = 1) -> Iterator[CubeGame]:
+    return (
+        game_factory(game_record=game_record, line_number=line_number)
+        for line_number, game_record in enumerate(game_records, start=first_line_number)
+    )
 
 
 # Find impossible games according to rules - restricted number of cubes in one set.
+@counted
 def resolve_impossible_game(game: CubeGame, for_color: CubeColorT, max_in_bag: int) -> bool:
     """Returns True if the game is impossible"""
-    # print(game.game_number)
 
     # Get SUM of colors for every set in the game
     for game_set in game.game_sets:
@@ -140,65 +203,415 @@ def resolve_impossible_game(game: CubeGame, for_color: CubeColorT, max_in_bag: i
 
         # If there is more colors revealed in one set then in the entire bag, the game is not possible
         if cubes_in_set_with_same_color > max_in_bag:
-            print(
-                f"Game ID {game.game_number} is impossible for color {for_color} with maximum {max_in_bag} cubes in the "
-                f"bag compared to {cubes_in_set_with_same_color} revealed in set {game_set.revealed_order}"
+            logger.debug(
+                "Game ID %s is impossible for color %s with maximum %s cubes in the bag "
+                "compared to %s revealed in set %s",
+                game.game_number,
+                for_color,
+                max_in_bag,
+                cubes_in_set_with_same_color,
+                game_set.revealed_order,
             )
             return True
 
     return False
 
 
-def find_impossible_games(rules: dict[CubeColorT, int]):
+def find_impossible_games(games: Iterable[CubeGame], rules: dict[CubeColorT, int]):
+    possible_games = []
     impossible_games = []
 
-    for game in game_list_all:
+    for game in games:
         for color, max_in_bag in rules.items():
-            is_impossible = resolve_impossible_game(game=game, for_color=color, max_in_bag=max_in_bag)
-            if is_impossible and game not in impossible_games:
+            if resolve_impossible_game(game=game, for_color=color, max_in_bag=max_in_bag):
                 impossible_games.append(game)
                 break
-
-    possible_games = set(game_list_all) - set(impossible_games)
+        else:
+            possible_games.append(game)
 
     return possible_games, impossible_games
 
 
+class CubeGameStream:
+    """
+    Online evaluator - games are fed one by one, only running totals are kept.
+
+    Many rule sets are evaluated in the same pass. Every game is reduced to its per-color maxima once,
+    the game is possible for rule set when no maximum is above the limit of its color.
+
+    Example:
+        stream = CubeGameStream(rule_sets={"part one": BAG_RULES, "small bag": {"red": 5, "green": 5, "blue": 5}})
+        for record in read_lines(INPUT_PATH):
+            stream.feed_record(record)
+        stream.possible_id_sums  # {"part one": 2720, "small bag": ...}
+        stream.power_sum         # 71535
+    """
+
+    def __init__(self, rule_sets: dict[str, dict[CubeColorT, int]]):
+        # Limits as (color index, limit) pairs - resolved once, not for every game
+        self.rule_limits = {
+            name: [(COLOR_INDEX[color], max_in_bag) for color, max_in_bag in rules.items()]
+            for name, rules in rule_sets.items()
+        }
+        self.possible_id_sums: dict[str, int] = dict.fromkeys(rule_sets, 0)
+        self.power_sum = 0
+        self.games_count = 0
+
+    def feed_maxima(self, game_number: int, maxima: list[int]) -> None:
+        for name, limits in self.rule_limits.items():
+            if all(maxima[color_index] <= max_in_bag for color_index, max_in_bag in limits):
+                self.possible_id_sums[name] += game_number
+
+        self.power_sum += reduce(mul, maxima)
+        self.games_count += 1
+
+    def feed(self, game: CubeGame) -> None:
+        self.feed_maxima(game_number=game.game_number, maxima=game.color_maxima())
+
+    def feed_record(self, game_record: str, line_number: int = 1) -> None:
+        """Evaluate the record straight from tokens - no CubeGame is created"""
+        game_number, maxima = game_record_maxima(game_record, line_number=line_number)
+        self.feed_maxima(game_number=game_number, maxima=maxima)
+
+    def feed_line(self, game_record: str) -> None:
+        self.feed_record(game_record, line_number=self.games_count + 1)
+
+    def totals(self) -> dict[str, int]:
+        return {**self.possible_id_sums, "part two": self.power_sum}
+
+
+def stream_solver() -> CubeGameStream:
+    """Possible id sum of the puzzle bag (part one) and power sum (part two)"""
+    return CubeGameStream(rule_sets={"part one": BAG_RULES})
+
+
+def game_record_maxima(game_record: str, line_number: int = 1) -> tuple[int, list[int]]:
+    """
+    Game id and highest count of every color in any set - straight from tokens.
+
+    Counts of the same color within a set are added up first, same as GameSet.add_cubes: "3 red, 4 red" = 7 red.
+    """
+    game_number = None
+    maxima = [0] * len(COLORS)
+    set_counts = [0] * len(COLORS)
+    current_set = 0
+    for game_id, set_index, cube_color, cubes_count in tokenize_game_record(game_record, line_number=line_number):
+        game_number = game_id
+        # Previous set ended - its sums count toward the maxima
+        if set_index != current_set:
+            maxima = [max(highest, count) for highest, count in zip(maxima, set_counts)]
+            set_counts = [0] * len(COLORS)
+            current_set = set_index
+        set_counts[COLOR_INDEX[cube_color]] += cubes_count
+
+    maxima = [max(highest, count) for highest, count in zip(maxima, set_counts)]
+    return game_number, maxima
+
+
+def evaluate_stream(
+    game_records: Iterable[str], rule_sets: dict[str, dict[CubeColorT, int]]
+) -> Iterator[tuple[dict[str, int], int]]:
+    """Running (possible id sums per rule set, power sum) after every game"""
+    stream = CubeGameStream(rule_sets=rule_sets)
+    for line_number, game_record in enumerate(game_records, start=1):
+        stream.feed_record(game_record, line_number=line_number)
+        yield dict(stream.possible_id_sums), stream.power_sum
+
+
+@cache
+def load_numpy():
+    """NumPy module, None when it's not installed. Imported on first use - only GameCorpus needs it."""
+    try:
+        import numpy
+    except ImportError:  # Optional - pure python path is used without it
+        return None
+    return numpy
+
+
+class GameCorpus:
+    """
+    Every game reduced once to its id and per-color maxima (N x 3 table) - many bag configurations
+    are then evaluated against it in one call.
+
+    Example:
+        corpus = GameCorpus(read_lines(INPUT_PATH))
+        corpus.possible_id_sums([BAG_RULES, {"red": 5, "green": 5, "blue": 5}])  # [2720, 288]
+    """
+
+    # Biggest prefix sum cube - more levels are evaluated by the sweep
+    MAX_CUBE_CELLS = 1 << 24
+    # Rule sets of one sweep - their levels bound the plane to (RULES_BATCH + 1) ^ 2 cells
+    RULES_BATCH = 256
+    # Rule sets compared with games of a block at once
+    RULES_CHUNK = 64
+
+    @stage("cube_conundrum.index")
+    def __init__(self, game_records: Iterable[str]):
+        ids = []
+        maxima = []
+        for line_number, game_record in enumerate(game_records, start=1):
+            game_number, game_maxima = game_record_maxima(game_record, line_number=line_number)
+            ids.append(game_number)
+            maxima.append(game_maxima)
+
+        np = load_numpy()
+        self.vectorized = np is not None
+        if not self.vectorized:
+            self.ids = ids
+            self.maxima = maxima
+            return
+
+        # NumPy arrays are built once - N ids and N x 3 maxima
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.maxima = np.asarray(maxima, dtype=np.int64).reshape(len(maxima), len(COLORS))
+
+        # Distinct maxima of every color and position of every game among them (1..D)
+        self.distinct = [np.unique(self.maxima[:, color_index]) for color_index in range(len(COLORS))]
+        self.positions = np.empty_like(self.maxima)
+        for color_index, values in enumerate(self.distinct):
+            self.positions[:, color_index] = np.searchsorted(values, self.maxima[:, color_index]) + 1
+
+        # Sweep goes along the color with most distinct maxima - games ordered by it once, for every sweep
+        self.sweep_color = max(range(len(COLORS)), key=lambda color_index: len(self.distinct[color_index]))
+        self.plane_colors = [color_index for color_index in range(len(COLORS)) if color_index != self.sweep_color]
+        sweep_order = np.argsort(self.positions[:, self.sweep_color], kind="stable")
+        self.sweep_ids = self.ids[sweep_order]
+        self.sweep_positions = self.positions[sweep_order, self.sweep_color]
+        self.plane_positions = self.positions[sweep_order][:, self.plane_colors]
+
+    @staticmethod
+    def rule_limits(rules: dict[CubeColorT, int]) -> list[int | None]:
+        """Limit of every color, None for color without limit"""
+        limits: list[int | None] = [None] * len(COLORS)
+        for color, max_in_bag in rules.items():
+            limits[COLOR_INDEX[color]] = max_in_bag
+        return limits
+
+    def possible_id_sums(self, rule_sets: list[dict[CubeColorT, int]]) -> list[int]:
+        """SUM of possible game ids for every rule set"""
+        if self.vectorized:
+            return self._possible_id_sums_vectorized(rule_sets)
+
+        # Games with the same maxima are one bucket - rule sets are compared with buckets, not games
+        buckets: dict[tuple[int, ...], int] = {}
+        for game_number, maxima in zip(self.ids, self.maxima):
+            buckets[tuple(maxima)] = buckets.get(tuple(maxima), 0) + game_number
+
+        results = []
+        for rules in rule_sets:
+            limits = [(index, limit) for index, limit in enumerate(self.rule_limits(rules)) if limit is not None]
+            results.append(
+                sum(
+                    id_sum
+                    for maxima, id_sum in buckets.items()
+                    if all(maxima[index] <= limit for index, limit in limits)
+                )
+            )
+        return results
+
+    def _possible_id_sums_vectorized(self, rule_sets: list[dict[CubeColorT, int]]) -> list[int]:
+        """
+        Only the order of maxima and limits matters. Rule set keeps the distinct maxima within its limit
+        (0..D) of every color, game fits when its position among them (1..D) is not above that.
+
+        Every color is compressed to levels - distinct positions of the rule sets. Levels of a color are fewer
+        than both its distinct maxima and its distinct limits. Ids are summed into a cube indexed by levels
+        and turned into 3D prefix sums - sum for rule set is then one lookup:
+
+          cube[r, g, b] = SUM of ids of games with levels <= (r, g, b)
+
+        Too many levels for the cube - rule sets are answered by the sweep, RULES_BATCH of them at once.
+        """
+        np = load_numpy()
+        if not rule_sets:
+            return []
+        if not len(self.ids):
+            return [0] * len(rule_sets)
+
+        no_limit = np.iinfo(np.int64).max
+        limits = np.array(
+            [[no_limit if limit is None else limit for limit in self.rule_limits(rules)] for rules in rule_sets],
+            dtype=np.int64,
+        )
+        rule_positions = np.empty_like(limits)
+        for color_index, values in enumerate(self.distinct):
+            rule_positions[:, color_index] = np.searchsorted(values, limits[:, color_index], side="right")
+
+        levels = [np.unique(rule_positions[:, color_index]) for color_index in range(len(COLORS))]
+        level_counts = [len(color_levels) for color_levels in levels]
+        if np.prod(level_counts, dtype=np.float64) > self.MAX_CUBE_CELLS:
+            sums = np.concatenate(
+                [
+                    self._sweep(rule_positions[batch_start : batch_start + self.RULES_BATCH])
+                    for batch_start in range(0, len(rule_positions), self.RULES_BATCH)
+                ]
+            )
+            return sums.tolist()
+
+        # Level the game fits from - len(levels) = fits no rule set
+        game_levels = np.empty_like(self.positions)
+        rule_levels = np.empty_like(rule_positions)
+        for color_index, color_levels in enumerate(levels):
+            game_levels[:, color_index] = np.searchsorted(color_levels, self.positions[:, color_index])
+            rule_levels[:, color_index] = np.searchsorted(color_levels, rule_positions[:, color_index])
+        fits_any = np.all(game_levels < np.array(level_counts), axis=1)
+
+        cube = np.zeros(level_counts, dtype=np.int64)
+        np.add.at(cube, tuple(game_levels[fits_any].T), self.ids[fits_any])
+        for axis in range(len(COLORS)):
+            cube = cube.cumsum(axis=axis)
+        return cube[tuple(rule_levels.T)].tolist()
+
+    def _sweep(self, rule_positions):
+        """
+        Offline dominance sweep - games ordered by the sweep color, rule set fits the first `stop` of them.
+        The other two colors are compressed to levels of the rule sets and form a plane.
+
+        Games are added to the plane block by block and its 2D prefix sums are computed before rule sets
+        stopping in the next block are answered:
+
+          SUM of ids = plane prefix[level a, level b]           games of the blocks before
+                     + games of the block before the stop      compared one by one
+
+        Blocks are sized so that prefix sums over the plane and comparisons cost about the same.
+        """
+        np = load_numpy()
+        num_of_games = len(self.sweep_ids)
+
+        # Games fitting the sweep color of the rule set come first
+        stops = np.searchsorted(self.sweep_positions, rule_positions[:, self.sweep_color], side="right")
+
+        rule_levels = []
+        game_levels = []
+        for plane_index, color_index in enumerate(self.plane_colors):
+            levels, rule_level = np.unique(rule_positions[:, color_index], return_inverse=True)
+            rule_levels.append(rule_level.ravel())
+            # Level of every position (1..D) looked up, not searched for every game.
+            # len(levels) = fits no rule set - counted on the last row/column of the plane, never looked up
+            position_levels = np.searchsorted(levels, np.arange(len(self.distinct[color_index]) + 1))
+            game_levels.append(position_levels[self.plane_positions[:, plane_index]])
+        rule_a, rule_b = rule_levels
+        game_a, game_b = game_levels
+        shape = (int(rule_a.max()) + 2, int(rule_b.max()) + 2)
+        cells = game_a * shape[1] + game_b
+
+        num_of_blocks = min(max(isqrt(len(stops) * num_of_games // (shape[0] * shape[1])), 1), num_of_games)
+        block_size = -(-num_of_games // num_of_blocks)
+
+        # Rule sets grouped by the block of their stop
+        blocks = stops // block_size
+        order = np.argsort(blocks, kind="stable")
+        block_numbers, group_starts = np.unique(blocks[order], return_index=True)
+        groups = np.split(order, group_starts[1:])
+
+        sums = np.zeros(len(stops), dtype=np.int64)
+        plane = np.zeros(shape[0] * shape[1], dtype=np.int64)
+        prefix = np.zeros(shape, dtype=np.int64)
+        added = 0
+        for block_number, group in zip(block_numbers.tolist(), groups):
+            block_start = block_number * block_size
+            block_end = min(block_start + block_size, num_of_games)
+
+            if added < block_start:
+                np.add.at(plane, cells[added:block_start], self.sweep_ids[added:block_start])
+                prefix = plane.reshape(shape).cumsum(axis=0).cumsum(axis=1)
+                added = block_start
+            sums[group] = prefix[rule_a[group], rule_b[group]]
+
+            block_ids = self.sweep_ids[block_start:block_end]
+            block_indexes = np.arange(block_end - block_start)
+            for chunk_start in range(0, len(group), self.RULES_CHUNK):
+                chunk = group[chunk_start : chunk_start + self.RULES_CHUNK]
+                possible = block_indexes < (stops[chunk] - block_start)[:, None]
+                possible &= game_a[block_start:block_end] <= rule_a[chunk][:, None]
+                possible &= game_b[block_start:block_end] <= rule_b[chunk][:, None]
+                sums[chunk] += possible @ block_ids
+
+        return sums
+
+
+def game_power(game: CubeGame) -> int:
+    """Minimum cubes of every color multiplied together"""
+    return reduce(mul, game.minimum_cubes_per_color(colors=list(COLORS)).values())
+
+
+class GameLog:
+    """
+    Games of the records, built again on every iteration - one CubeGame is in memory at a time.
+
+    Example:
+        games = GameLog(LineSource("games.txt"))
+        part_one(games), part_two(games)  # file is read twice, game by game
+    """
+
+    def __init__(self, game_records: Iterable[str], first_line_number: int = 1):
+        self.game_records = game_records
+        self.first_line_number = first_line_number
+
+    def __iter__(self) -> Iterator[CubeGame]:
+        return normalized_games(self.game_records, first_line_number=self.first_line_number)
+
+
+@stage("cube_conundrum.parse")
+def parse(lines: Iterable[str], first_line_number: int = 1) -> GameLog:
+    """
+    Games are built lazily while solving - see GameLog.
+
+    Re-iterable lines (LineSource reading the file again, list) are kept as they are, every part reads them
+    on its own. One-shot iterators (stdin) are collected - both parts need them.
+    """
+    if isinstance(lines, Iterator):
+        lines = list(lines)
+    return GameLog(lines, first_line_number=first_line_number)
+
+
+@stage("cube_conundrum.solve")
+def part_one(games: Iterable[CubeGame]) -> int:
+    return sum(
+        game.game_number
+        for game in games
+        if not any(
+            resolve_impossible_game(game=game, for_color=color, max_in_bag=max_in_bag)
+            for color, max_in_bag in BAG_RULES.items()
+        )
+    )
+
+
+@stage("cube_conundrum.solve")
+def part_two(games: Iterable[CubeGame]) -> int:
+    return sum(game_power(game) for game in games)
+
+
 if __name__ == "__main__":
-    part_one = True
-    part_two = True
+    solve_part_one = True
+    solve_part_two = True
 
     # Part 1: Find impossible games
-    if part_one:
+    if solve_part_one:
         print("PART ONE")
-        rules: dict[CubeColorT, int] = {"red": 12, "green": 13, "blue": 14}
-        possible_games, impossible_games = find_impossible_games(rules)
+        possible_games, impossible_games = find_impossible_games(normalized_games(read_lines(INPUT_PATH)), BAG_RULES)
 
         print("Impossible sum:", len(impossible_games))
         print("Possible sum:", len(possible_games))
         checksum = len(impossible_games) + len(possible_games)
-        if checksum > len(input_all_games):
-            raise ValueError(f"Checksum value {checksum} can't be higher the list of all games {len(input_all_games)} ")
         print("Checksum:", checksum)
 
         possible_ids = [game.game_number for game in possible_games]
         print("Happy number", sum(possible_ids))
 
     # Part 2: Find minimum cubes in the bag
-    if part_two:
+    if solve_part_two:
         print("\nPART TWO")
         multiply_results = []
         colors = ["red", "green", "blue"]
-        for game in game_list_all:
+        for game in normalized_games(read_lines(INPUT_PATH)):
             minimum_cubes_per_color = game.minimum_cubes_per_color(colors=colors)
             cube_set_multiplied = reduce(mul, minimum_cubes_per_color.values())  # Multiply numbers together
             multiply_results.append(cube_set_multiplied)
-            print(
-                "Game ID",
+            logger.debug(
+                "Game ID %s has minimum set of cubes: %s with multiply result: %s",
                 game.game_number,
-                "has minimum set of cubes:",
                 minimum_cubes_per_color,
-                "with multiply result:",
                 cube_set_multiplied,
             )
 
@@ -6,22 +6,33 @@ Part Two: 81166799
 
 from __future__ import annotations
 
+import logging
+import mmap
+from array import array
+from collections.abc import Sequence
 from enum import StrEnum
-from typing import Self, Any
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Self
+from bisect import bisect_right
 from functools import reduce
 from operator import mul
 
-MappedEngineT = list[list["Node"]]
+from advent_of_code_2023.char_classes import CLASS_TABLE, DIGIT, DOT, SYMBOL, classify, digit_runs, has_symbol
+from advent_of_code_2023.input_reader import read_lines, read_mmap_lines
+from advent_of_code_2023.instrumentation import counted, stage
 
+try:
+    import numpy as np
+except ImportError:  # Optional - pure python path is used without it
+    np = None
 
-def load_file() -> list[str]:
-    # Load file from disk
-    with open("input.txt", "rb") as f:
-        lines = f.readlines()
-        return [line.decode("utf-8").strip() for line in lines]
+MappedEngineT = list[list["Node"]]
+GridPositionT = tuple[int, int]  # (row, index)
 
+logger = logging.getLogger(__name__)
 
-input_engine = load_file()
+INPUT_PATH = Path(__file__).parent / "input.txt"
 
 input_web_example = [
     "467..114..",
@@ -37,17 +48,7 @@ input_web_example = [
 ]
 
 
-def is_int(val: Any):
-    if val is None:
-        return False
-
-    try:
-        int(val)
-        return True
-    except ValueError:
-        return False
-
-
+@counted
 def localize_node(mapped_engine: MappedEngineT, row_number: int, index: int) -> Node:
     return mapped_engine[row_number][index]
 
@@ -62,6 +63,8 @@ class NodeTypeEnum(StrEnum):
 
 
 class NodePosition:
+    __slots__ = ("row_number", "start_index", "end_index")
+
     def __init__(self, row_number: int, start_index: int, end_index: int):
         self.row_number = row_number
         self.start_index = start_index
@@ -72,11 +75,16 @@ class NodePosition:
 
 
 class Node:
+    """
+    Node of mapped engine. Nodes don't hold the mapping - it's passed to every method looking around.
+    """
+
+    __slots__ = ("type", "value", "position")
+
     def __init__(self, value: int, node_type: NodeTypeEnum, position: NodePosition):
         self.type = node_type
         self.value = value
         self.position = position
-        self.mapping: MappedEngineT | None = None
 
     def __repr__(self):
         return f"Node({self.type}, {self.value}, {self.position})"
@@ -97,8 +105,8 @@ class Node:
 
         return False
 
-    def is_right_edge(self) -> bool:
-        if self.node_on_right() is None:
+    def is_right_edge(self, mapping: MappedEngineT) -> bool:
+        if self.node_on_right(mapping) is None:
             return True
 
         return False
@@ -112,16 +120,16 @@ class Node:
 
         return False
 
-    def is_bottom_edge(self) -> bool:
+    def is_bottom_edge(self, mapping: MappedEngineT) -> bool:
         row_below = self.position.row_number + 1
 
         try:
-            self.mapping[row_below]
+            mapping[row_below]
             return False
         except IndexError:
             return True
 
-    def node_on_left(self) -> Self | None:
+    def node_on_left(self, mapping: MappedEngineT) -> Self | None:
         """
         Coverage (1):
              - - - - - - - - - -
@@ -130,11 +138,11 @@ class Node:
         """
         if not self.is_left_edge():
             left_index = self.position.start_index - 1
-            return localize_node(mapped_engine=self.mapping, row_number=self.position.row_number, index=left_index)
+            return localize_node(mapped_engine=mapping, row_number=self.position.row_number, index=left_index)
 
         return None
 
-    def node_on_right(self) -> Self | None:
+    def node_on_right(self, mapping: MappedEngineT) -> Self | None:
         """
         Coverage (1):
              - - - - - - - - - -
@@ -144,12 +152,12 @@ class Node:
 
         try:
             right_index = self.position.end_index + 1
-            return localize_node(mapped_engine=self.mapping, row_number=self.position.row_number, index=right_index)
+            return localize_node(mapped_engine=mapping, row_number=self.position.row_number, index=right_index)
         except IndexError:
             # Edge Node - no one on right
             return None
 
-    def nodes_above(self) -> list[Self] | None:
+    def nodes_above(self, mapping: MappedEngineT) -> list[Self] | None:
         """
         Coverage (1):
              - - 1 1 1 1 1 1 - -
@@ -166,26 +174,26 @@ class Node:
         else:
             start_index = self.position.start_index
 
-        if not self.is_right_edge():
+        if not self.is_right_edge(mapping):
             end_index = self.position.end_index + 1
         else:
             end_index = self.position.end_index
 
         nodes_above = []
         for position in range(start_index, end_index + 1):
-            node_on_position = localize_node(mapped_engine=self.mapping, row_number=row_above, index=position)
+            node_on_position = localize_node(mapped_engine=mapping, row_number=row_above, index=position)
             nodes_above.append(node_on_position)
 
         return nodes_above
 
-    def nodes_below(self) -> list[Self] | None:
+    def nodes_below(self, mapping: MappedEngineT) -> list[Self] | None:
         """
         Coverage (1):
              - - - - - - - - - -
              - - - n o d e - - -
              - - 1 1 1 1 1 1 - -
         """
-        if not self.is_bottom_edge():
+        if not self.is_bottom_edge(mapping):
             row_below = self.position.row_number + 1
         else:
             return None
@@ -195,23 +203,24 @@ class Node:
         else:
             start_index = self.position.start_index
 
-        if not self.is_right_edge():
+        if not self.is_right_edge(mapping):
             end_index = self.position.end_index + 1
         else:
             end_index = self.position.end_index
 
         nodes_below = []
         for position in range(start_index, end_index + 1):
-            node_on_position = localize_node(mapped_engine=self.mapping, row_number=row_below, index=position)
+            node_on_position = localize_node(mapped_engine=mapping, row_number=row_below, index=position)
             nodes_below.append(node_on_position)
 
         return nodes_below
 
-    def neighbors(self, unique=True):
-        left_node = self.node_on_left()
-        right_node = self.node_on_right()
-        above_nodes = self.nodes_above() or []
-        below_nodes = self.nodes_below() or []
+    @counted
+    def neighbors(self, mapping: MappedEngineT, unique=True):
+        left_node = self.node_on_left(mapping)
+        right_node = self.node_on_right(mapping)
+        above_nodes = self.nodes_above(mapping) or []
+        below_nodes = self.nodes_below(mapping) or []
 
         nodes_around = [left_node, right_node, *above_nodes, *below_nodes]
         nodes_around = [node for node in nodes_around if isinstance(node, Node)]
@@ -221,22 +230,22 @@ class Node:
 
         return nodes_around
 
-    def adjacent_symbol_nodes(self) -> list[Self]:
-        unique_neighbors = self.neighbors()
+    def adjacent_symbol_nodes(self, mapping: MappedEngineT) -> list[Self]:
+        unique_neighbors = self.neighbors(mapping)
         symbol_nodes = [node for node in unique_neighbors if node.type == NodeTypeEnum.symbol]
         return symbol_nodes
 
-    def is_engine_part(self) -> bool:
-        if self.adjacent_symbol_nodes():
+    def is_engine_part(self, mapping: MappedEngineT) -> bool:
+        if self.adjacent_symbol_nodes(mapping):
             return True
 
         return False
 
-    def is_gear(self) -> tuple[bool, list[Self]]:
+    def is_gear(self, mapping: MappedEngineT) -> tuple[bool, list[Self]]:
         # If this Node is star symbol
         if self.type == NodeTypeEnum.symbol and self.value == "*":
             # Get NUM neighbors
-            unique_neighbors = self.neighbors()
+            unique_neighbors = self.neighbors(mapping)
             adjacent_parts = [node for node in unique_neighbors if node.type == NodeTypeEnum.num]
 
             # Has to have at least 2 num neighbor nodes
@@ -245,8 +254,8 @@ class Node:
 
         return False, []
 
-    def gear_ratio(self) -> int | None:
-        is_gear, adjacent_parts = self.is_gear()
+    def gear_ratio(self, mapping: MappedEngineT) -> int | None:
+        is_gear, adjacent_parts = self.is_gear(mapping)
         if is_gear:
             adjacent_parts_values = [node.value for node in adjacent_parts]
             return reduce(mul, adjacent_parts_values)
@@ -258,22 +267,18 @@ def engine_row_mapping(engine_row: str, row_index: int):
     index_stack = []
     value_stack = []
     mapped_row = []
+    classes = classify(engine_row)
 
     for current_index, entity in enumerate(engine_row):
         # Is number
-        if is_int(entity):
+        if classes[current_index] == DIGIT:
             # Append index and value to stacks...next value might be also number.
             index_stack.append(current_index)
             value_stack.append(str(entity))
 
             # If next_val is number, just iterate again and fulfill stacks...
-            try:
-                next_val = engine_row[current_index + 1]
-            except IndexError:
-                # Value is right edge. Example: .............=260
-                next_val = None
-
-            if is_int(next_val):
+            # Value on the right edge has no next_val. Example: .............=260
+            if current_index + 1 < len(classes) and classes[current_index + 1] == DIGIT:
                 continue
 
             # Until next_val is not a number
@@ -288,7 +293,7 @@ def engine_row_mapping(engine_row: str, row_index: int):
                 index_stack = []
                 value_stack = []
 
-        elif entity == ".":
+        elif classes[current_index] == DOT:
             new_position = NodePosition(row_number=row_index, start_index=current_index, end_index=current_index)
             new_node = Node(value=entity, node_type=NodeTypeEnum.dot, position=new_position)
         else:
@@ -306,7 +311,8 @@ def engine_row_mapping(engine_row: str, row_index: int):
     return mapped_row
 
 
-def engine_mapping(engine_map: list[str]) -> MappedEngineT:
+@stage("gear_ratios.map")
+def engine_mapping(engine_map: Iterable[str]) -> MappedEngineT:
     mapped_engine = []
     for row_index, engine_row in enumerate(engine_map):
         mapped_row = engine_row_mapping(engine_row=engine_row, row_index=row_index)
@@ -315,71 +321,459 @@ def engine_mapping(engine_map: list[str]) -> MappedEngineT:
     return mapped_engine
 
 
-def inject_mapping_to_node(mapped_engine: MappedEngineT):
-    for row in mapped_engine:
-        for node in row:
-            node.mapping = mapped_engine
+class NumberSpan(NamedTuple):
+    """Number in the schematic. Indexes are inclusive - same as NodePosition."""
 
+    row: int
+    start: int
+    end: int
+    value: int
 
-def find_engine_parts(mapped_engine: MappedEngineT) -> list[Node]:
-    engine_parts = []
-    for row in mapped_engine:
-        for node in row:
-            if node.type == NodeTypeEnum.num and node.is_engine_part():
-                if node not in engine_parts:
-                    engine_parts.append(node)
 
-    return engine_parts
+class NumberSpans(Sequence[NumberSpan]):
+    """Read-only view of the span table - NumberSpan is built on access"""
 
+    def __init__(self, schematic: EngineSchematic):
+        self.schematic = schematic
+
+    def __len__(self) -> int:
+        return len(self.schematic.span_starts)
+
+    def __getitem__(self, position: int) -> NumberSpan:
+        if not -len(self) <= position < len(self):
+            raise IndexError(f"Number {position} is out of {len(self)} numbers")
+        return self.schematic.number(position % len(self))
+
+    def __iter__(self) -> Iterator[NumberSpan]:
+        return map(self.schematic.number, range(len(self)))
+
+
+class EngineSchematic:
+    """
+    Compact engine schematic - raw bytes of every row in one flat bytearray + table of number spans.
+
+    Cell (row, index) is on offset row * width + index. Number spans are flat columns of machine ints
+    (row, start, end) - 12 bytes per number, no object per number. Spans of row r are on positions
+    row_offsets[r]:row_offsets[r + 1] of every column, sorted by start. Values are read from the grid when
+    a NumberSpan is built.
+
+    Example:
+      467..114..
+      ...*......  = grid b"467..114.....*......", span columns rows [0, 0], starts [0, 5], ends [2, 7],
+                    row_offsets [0, 2, 2], numbers [(0, 0, 2, 467), (0, 5, 7, 114)]
+
+    Part number sum and gear ratio sum are computed once and then kept up to date by update_rows.
+    """
+
+    def __init__(self, engine_map: Iterable[str]):
+        self.grid = bytearray()
+        self.span_rows = array("i")
+        self.span_starts = array("i")
+        self.span_ends = array("i")
+        self.row_offsets = array("q", [0])
+        self.width = 0
+        self.height = 0
+
+        # Running sums - None until first requested
+        self._part_number_sum: int | None = None
+        self._gear_ratio_sum: int | None = None
+
+        for engine_row in engine_map:
+            self.add_row(engine_row.encode())
+
+    @property
+    def numbers(self) -> NumberSpans:
+        """Every number of the schematic - sequence view of the span table, nothing is copied"""
+        return NumberSpans(self)
+
+    def number(self, position: int) -> NumberSpan:
+        """Number on the position of the span table"""
+        row_index = self.span_rows[position]
+        start = self.span_starts[position]
+        end = self.span_ends[position]
+        offset = row_index * self.width
+        return NumberSpan(row_index, start, end, int(self.grid[offset + start : offset + end + 1]))
+
+    def row_spans(self, row_index: int) -> Iterator[NumberSpan]:
+        return map(self.number, range(self.row_offsets[row_index], self.row_offsets[row_index + 1]))
+
+    def add_row(self, engine_row: bytes) -> None:
+        if not self.height:
+            self.width = len(engine_row)
+        elif len(engine_row) != self.width:
+            raise ValueError(f"Row {self.height} has width {len(engine_row)}, expected {self.width}")
+
+        for start_index, end_index in digit_runs(classify(engine_row)):
+            self.span_starts.append(start_index)
+            self.span_ends.append(end_index - 1)
+        self.span_rows.extend(repeat(self.height, len(self.span_starts) - len(self.span_rows)))
+        self.row_offsets.append(len(self.span_starts))
+        self.grid.extend(engine_row)
+        self.height += 1
+
+        # New row changes the bottom edge - running sums are computed again when requested
+        self._part_number_sum = None
+        self._gear_ratio_sum = None
+
+    def replace_row_spans(self, row_index: int, engine_row: bytes) -> None:
+        """Spans of the row found again. Columns after the row are shifted when the count of its numbers changes."""
+        runs = list(digit_runs(classify(engine_row)))
+        first, last = self.row_offsets[row_index], self.row_offsets[row_index + 1]
+
+        self.span_rows[first:last] = array("i", [row_index] * len(runs))
+        self.span_starts[first:last] = array("i", [start_index for start_index, _ in runs])
+        self.span_ends[first:last] = array("i", [end_index - 1 for _, end_index in runs])
+
+        shift = len(runs) - (last - first)
+        if shift:
+            for next_row in range(row_index + 1, self.height + 1):
+                self.row_offsets[next_row] += shift
+
+    def row_part_number_sum(self, row_index: int) -> int:
+        """SUM of engine parts on the row"""
+        return sum(span.value for span in self.row_spans(row_index) if self.is_engine_part(span))
+
+    def row_gear_ratio_sum(self, row_index: int) -> int:
+        """SUM of gear ratios of stars on the row - numbers are looked up only on the row and the rows around"""
+        row = self.row(row_index)
+        adjacent_rows = range(max(row_index - 1, 0), min(row_index + 2, self.height))
+
+        ratio_sum = 0
+        index = row.find(b"*")
+        while index != -1:
+            adjacent_parts = [
+                span.value for adjacent_row in adjacent_rows for span in self.spans_around(adjacent_row, index)
+            ]
+            if len(adjacent_parts) >= 2:
+                ratio_sum += reduce(mul, adjacent_parts)
+            index = row.find(b"*", index + 1)
 
-def find_gears(mapped_engine: MappedEngineT):
-    gear_nodes = []
-    for row in mapped_engine:
-        for node in row:
-            is_gear, num_nodes = node.is_gear()
-            if is_gear:
-                gear_nodes.append((node, num_nodes))
+        return ratio_sum
 
-    return gear_nodes
+    def spans_around(self, row_index: int, index: int) -> list[NumberSpan]:
+        """
+        Spans of one row touching the index - start <= index + 1 and end >= index - 1.
 
+        Spans of a row don't overlap and are sorted by start, so their ends are sorted too. Spans starting up to
+        index + 1 are found by bisect in the row's part of the starts column, touching ones are at its end -
+        at most 3 of them.
+        """
+        first = self.row_offsets[row_index]
+        stop = bisect_right(self.span_starts, index + 1, first, self.row_offsets[row_index + 1])
+        start = stop
+        while start > first and self.span_ends[start - 1] >= index - 1:
+            start -= 1
+        return [self.number(position) for position in range(start, stop)]
+
+    def part_number_sum(self) -> int:
+        if self._part_number_sum is None:
+            self._part_number_sum = sum(self.row_part_number_sum(row_index) for row_index in range(self.height))
+        return self._part_number_sum
+
+    def gear_ratio_sum(self) -> int:
+        if self._gear_ratio_sum is None:
+            self._gear_ratio_sum = sum(self.row_gear_ratio_sum(row_index) for row_index in range(self.height))
+        return self._gear_ratio_sum
+
+    def update_rows(self, rows: dict[int, str]) -> None:
+        """
+        Replace rows and adjust running sums by deltas.
 
-if __name__ == "__main__":
-    # Create mapped engine
-    mapped_engine = engine_mapping(engine_map=input_engine)
+        Row change affects only numbers and stars on the row itself and the rows next to it, so only those
+        are evaluated before and after the change - O(row width * log(row width)) per changed row. When the count
+        of numbers on the row changes, span columns after it are moved (memmove) and row offsets shifted.
+
+        Example: schematic.update_rows({3: "......#..."})
+        """
+        for row_index, engine_row in rows.items():
+            if not 0 <= row_index < self.height:
+                raise IndexError(f"Row {row_index} is out of the schematic with {self.height} rows")
+            if len(engine_row.encode()) != self.width:
+                raise ValueError(f"Row {row_index} has width {len(engine_row.encode())}, expected {self.width}")
+
+        affected_rows = sorted(
+            {
+                adjacent_row
+                for row_index in rows
+                for adjacent_row in (row_index - 1, row_index, row_index + 1)
+                if 0 <= adjacent_row < self.height
+            }
+        )
+
+        track_parts = self._part_number_sum is not None
+        track_gears = self._gear_ratio_sum is not None
+        if track_parts:
+            self._part_number_sum -= sum(self.row_part_number_sum(row_index) for row_index in affected_rows)
+        if track_gears:
+            self._gear_ratio_sum -= sum(self.row_gear_ratio_sum(row_index) for row_index in affected_rows)
+
+        for row_index, engine_row in rows.items():
+            engine_row = engine_row.encode()
+            offset = row_index * self.width
+            self.grid[offset : offset + self.width] = engine_row
+            self.replace_row_spans(row_index, engine_row)
+
+        if track_parts:
+            self._part_number_sum += sum(self.row_part_number_sum(row_index) for row_index in affected_rows)
+        if track_gears:
+            self._gear_ratio_sum += sum(self.row_gear_ratio_sum(row_index) for row_index in affected_rows)
+
+    def row(self, row_index: int) -> bytes:
+        offset = row_index * self.width
+        return self.grid[offset : offset + self.width]
+
+    def cell(self, row_index: int, index: int) -> str:
+        return chr(self.grid[row_index * self.width + index])
+
+    def border(self, span: NumberSpan) -> Iterator[GridPositionT]:
+        """
+        Every cell around the span. Cells out of the grid are skipped.
+
+        Coverage (1):
+             - - 1 1 1 1 1 1 - -
+             - - 1 n u m 1 - - -
+             - - 1 1 1 1 1 1 - -
+        """
+        left = max(span.start - 1, 0)
+        right = min(span.end + 1, self.width - 1)
+
+        for row_index in (span.row - 1, span.row + 1):
+            if 0 <= row_index < self.height:
+                for index in range(left, right + 1):
+                    yield row_index, index
+
+        if left < span.start:
+            yield span.row, left
+        if right > span.end:
+            yield span.row, right
+
+    @counted
+    def adjacent_symbols(self, span: NumberSpan) -> list[tuple[GridPositionT, str]]:
+        symbols = []
+        for row_index, index in self.border(span):
+            if CLASS_TABLE[self.grid[row_index * self.width + index]] == SYMBOL:
+                symbols.append(((row_index, index), self.cell(row_index, index)))
+
+        return symbols
+
+    @counted
+    def is_engine_part(self, span: NumberSpan) -> bool:
+        """Any symbol in the border. Border rows are checked slice by slice."""
+        left = max(span.start - 1, 0)
+        right = min(span.end + 1, self.width - 1)
+
+        for row_index in (span.row - 1, span.row, span.row + 1):
+            if 0 <= row_index < self.height:
+                offset = row_index * self.width
+                if has_symbol(self.grid[offset + left : offset + right + 1]):
+                    return True
+
+        return False
+
+
+def find_engine_parts(schematic: EngineSchematic) -> list[NumberSpan]:
+    if np is not None:
+        return find_engine_parts_vectorized(schematic=schematic)
+
+    return [span for span in schematic.numbers if schematic.is_engine_part(span)]
+
+
+def find_engine_parts_vectorized(schematic: EngineSchematic) -> list[NumberSpan]:
+    """
+    NumPy path for large schematics.
+
+    - Boolean mask of symbols, dilated with 3x3 kernel = every cell touching a symbol.
+    - Span is a part if any of its cells touches - OR reduced over span ranges of the flat mask.
+
+    Every cell of a span is a digit, so the mask isn't intersected with digits. Peak is ~3 bytes per cell
+    (classes + 2 masks), no prefix sum over the grid.
+    """
+    if not len(schematic.span_starts):
+        return []
+
+    height, width = schematic.height, schematic.width
+    classes = np.frombuffer(schematic.grid.translate(CLASS_TABLE), dtype=np.uint8).reshape(height, width)
+
+    # Dilate 3x3 - OR of the mask shifted left and right, then up and down
+    is_symbol = classes == SYMBOL
+    del classes
+    row_dilated = is_symbol.copy()
+    row_dilated[:, 1:] |= is_symbol[:, :-1]
+    row_dilated[:, :-1] |= is_symbol[:, 1:]
+    del is_symbol
+    dilated = row_dilated.copy()
+    dilated[1:] |= row_dilated[:-1]
+    dilated[:-1] |= row_dilated[1:]
+    del row_dilated
+
+    # Span columns are read in place
+    offsets = np.frombuffer(schematic.span_rows, dtype=np.intc).astype(np.int64) * width
+    bounds = np.empty(2 * len(offsets), dtype=np.int64)
+    bounds[0::2] = offsets + np.frombuffer(schematic.span_starts, dtype=np.intc)
+    bounds[1::2] = offsets + np.frombuffer(schematic.span_ends, dtype=np.intc) + 1
+    # Span reaching the end of the grid - its range runs to the end, there is no index past it
+    if bounds[-1] == dilated.size:
+        bounds = bounds[:-1]
 
-    # Inject created mapping to every Node. Nodes are aware of the mapping they are part of...
-    inject_mapping_to_node(mapped_engine=mapped_engine)
+    # Even ranges are spans, odd ones are gaps between them
+    is_part = np.logical_or.reduceat(dilated.ravel(), bounds)[0::2]
+
+    return [schematic.number(position) for position in np.flatnonzero(is_part).tolist()]
+
+
+class GearIndex:
+    """
+    Symbol -> adjacent numbers index built in one pass over the number spans.
+
+    Every symbol touching at least one number is indexed by its position. Stars are gears when they touch
+    2 or more numbers - gear ratio sum is accumulated in the same pass.
+
+    Example:
+      index = GearIndex(schematic)
+      index.gears(parts=2)              # stars with exactly 2 numbers
+      index.parts_adjacent_to((1, 3))   # numbers around symbol on row 1, index 3
+      index.parts_adjacent_to_symbol("#")
+    """
+
+    STAR = "*"
+
+    @stage("gear_ratios.index")
+    def __init__(self, schematic: EngineSchematic):
+        self.symbol_parts: dict[GridPositionT, list[NumberSpan]] = {}
+        self.symbols: dict[GridPositionT, str] = {}
+
+        # Per star - number of adjacent parts and their product
+        star_ratios: dict[GridPositionT, tuple[int, int]] = {}
+
+        for span in schematic.numbers:
+            for position, symbol in schematic.adjacent_symbols(span):
+                self.symbol_parts.setdefault(position, []).append(span)
+                self.symbols[position] = symbol
+
+                if symbol == self.STAR:
+                    count, product = star_ratios.get(position, (0, 1))
+                    star_ratios[position] = (count + 1, product * span.value)
+
+        self.gear_ratio_sum = sum(product for count, product in star_ratios.values() if count >= 2)
+
+    def parts_adjacent_to(self, position: GridPositionT) -> list[NumberSpan]:
+        return self.symbol_parts.get(position, [])
+
+    def parts_adjacent_to_symbol(self, symbol: str) -> list[NumberSpan]:
+        """Numbers adjacent to any symbol of given kind. Number touching more of them is listed once."""
+        parts = {}
+        for position, adjacent_parts in self.symbol_parts.items():
+            if self.symbols[position] == symbol:
+                parts.update(dict.fromkeys(adjacent_parts))
+
+        return list(parts)
+
+    def gears(self, parts: int | None = None) -> list[tuple[GridPositionT, list[NumberSpan]]]:
+        """Stars with exactly `parts` adjacent numbers. All gears (2 or more) when not given."""
+        return [
+            (position, adjacent_parts)
+            for position, adjacent_parts in self.symbol_parts.items()
+            if self.symbols[position] == self.STAR
+            and (len(adjacent_parts) == parts if parts is not None else len(adjacent_parts) >= 2)
+        ]
+
+
+def find_gears(schematic: EngineSchematic) -> list[tuple[GridPositionT, list[NumberSpan]]]:
+    """Star symbols with at least 2 adjacent numbers"""
+    return GearIndex(schematic=schematic).gears()
+
+
+@stage("gear_ratios.parse")
+def parse(lines: Iterable[str]) -> EngineSchematic:
+    return EngineSchematic(engine_map=lines)
+
+
+@stage("gear_ratios.solve")
+def part_one(schematic: EngineSchematic) -> int:
+    return sum(part.value for part in find_engine_parts(schematic=schematic))
+
+
+@stage("gear_ratios.solve")
+def part_two(schematic: EngineSchematic) -> int:
+    return GearIndex(schematic=schematic).gear_ratio_sum
+
+
+def solve_band(rows: list[str], own_rows: range, part_name: str) -> int:
+    """
+    Solve one horizontal band of the schematic.
+
+    Rows hold the band with one halo row above and below (except on the schematic edges). Halo rows are used only
+    for adjacency - numbers (part one) and stars (part two) are counted only on own rows. Every row is owned by
+    exactly one band, so nothing on a band boundary is counted twice.
+    """
+    schematic = EngineSchematic(engine_map=rows)
+
+    if part_name == "part_one":
+        return sum(part.value for part in find_engine_parts(schematic=schematic) if part.row in own_rows)
+
+    return sum(
+        reduce(mul, [part.value for part in adjacent_parts])
+        for (row_index, _), adjacent_parts in GearIndex(schematic=schematic).gears()
+        if row_index in own_rows
+    )
+
+
+def solve_byte_range(part_name: str, path: str, start: int, end: int) -> int:
+    """Parallel worker - band of rows between start and end byte offsets extended by one halo row on each side"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        has_top_halo = start > 0
+        has_bottom_halo = end < len(mapped)
+
+        halo_start = mapped.rfind(b"\n", 0, start - 1) + 1 if has_top_halo else start
+        halo_end = end
+        if has_bottom_halo:
+            next_new_line = mapped.find(b"\n", end)
+            halo_end = next_new_line + 1 if next_new_line != -1 else len(mapped)
+
+    rows = list(read_mmap_lines(path, start=halo_start, end=halo_end))
+    own_rows = range(1 if has_top_halo else 0, len(rows) - 1 if has_bottom_halo else len(rows))
+
+    return solve_band(rows=rows, own_rows=own_rows, part_name=part_name)
+
+
+if __name__ == "__main__":
+    inspect_test_node = False
 
     # Set TEST NODE ZERO location on engine map and evaluate if it's a part of the engine.
-    # Uncomment below for testing
-    test_node_0 = localize_node(mapped_engine=mapped_engine, row_number=0, index=27)
-    print("test node 0:", test_node_0)
-    print("is left edge:", test_node_0.is_left_edge())
-    print("is right edge", test_node_0.is_right_edge())
-    print("is top edge", test_node_0.is_top_edge())
-    print("Node on right:", test_node_0.node_on_right())
-    print("Node on left:", test_node_0.node_on_left())
-    print("above", test_node_0.nodes_above())
-    print("below", test_node_0.nodes_below())
-    print("neighbors not unique", test_node_0.neighbors(unique=False))
-    print("neighbors unique    ", test_node_0.neighbors())
-    print("symbol nodes:", test_node_0.adjacent_symbol_nodes())
-    print("is engine part?", test_node_0.is_engine_part())
-
-    # Find Nodes which are engine parts
-    engine_part_nodes = find_engine_parts(mapped_engine=mapped_engine)
-    for node in engine_part_nodes:
-        print(f"Part {node} adjacent to symbols: {node.adjacent_symbol_nodes()}")
-
-    engine_part_nodes_values = [node.value for node in engine_part_nodes]
-    print("Happy number:", sum(engine_part_nodes_values))
+    if inspect_test_node:
+        # Create mapped engine. Nodes look around in the mapping passed to them.
+        mapped_engine = engine_mapping(engine_map=read_lines(INPUT_PATH))
+
+        test_node_0 = localize_node(mapped_engine=mapped_engine, row_number=0, index=27)
+        print("test node 0:", test_node_0)
+        print("is left edge:", test_node_0.is_left_edge())
+        print("is right edge", test_node_0.is_right_edge(mapped_engine))
+        print("is top edge", test_node_0.is_top_edge())
+        print("Node on right:", test_node_0.node_on_right(mapped_engine))
+        print("Node on left:", test_node_0.node_on_left(mapped_engine))
+        print("above", test_node_0.nodes_above(mapped_engine))
+        print("below", test_node_0.nodes_below(mapped_engine))
+        print("neighbors not unique", test_node_0.neighbors(mapped_engine, unique=False))
+        print("neighbors unique    ", test_node_0.neighbors(mapped_engine))
+        print("symbol nodes:", test_node_0.adjacent_symbol_nodes(mapped_engine))
+        print("is engine part?", test_node_0.is_engine_part(mapped_engine))
+
+    schematic = EngineSchematic(engine_map=read_lines(INPUT_PATH))
+
+    # Find numbers which are engine parts
+    engine_parts = find_engine_parts(schematic=schematic)
+    # Adjacent symbols are looked up again just for the trace - only when it's enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        for part in engine_parts:
+            logger.debug("Part %s adjacent to symbols: %s", part, schematic.adjacent_symbols(part))
+
+    engine_part_values = [part.value for part in engine_parts]
+    print("Happy number:", sum(engine_part_values))
 
     # Part Two - find gears
-    # print("\nPart Two")
-    # gears = find_gears(mapped_engine=mapped_engine)
-    # ratios = []
-    # for gear in gears:
-    #     gear_node, adjacent_parts = gear
-    #     print(f"Gear {gear_node} adjacent to {adjacent_parts}")
-    #     ratios.append(gear_node.gear_ratio())
-    # print("Happy number:", sum(ratios))
+    print("\nPart Two")
+    gear_index = GearIndex(schematic=schematic)
+    if logger.isEnabledFor(logging.DEBUG):
+        for gear_position, adjacent_parts in gear_index.gears():
+            logger.debug("Gear %s adjacent to %s", gear_position, adjacent_parts)
+    print("Happy number:", gear_index.gear_ratio_sum)
@@ -3,18 +3,27 @@ Part One: 15205
 Part Two: 6189740
 """
 
+import logging
 import re
+from bisect import bisect_right
+from collections.abc import Sequence
 from enum import StrEnum
-from typing import Self
+from pathlib import Path
+from typing import Iterable, Iterator, Self
 
+from advent_of_code_2023.input_reader import BufferT, line_offsets, map_file, read_lines
+from advent_of_code_2023.instrumentation import counted, stage
 
-def load_file() -> list[str]:
-    with open("input.txt", "rb") as f:
-        lines = f.readlines()
-        return [line.decode("utf-8").strip() for line in lines]
+logger = logging.getLogger(__name__)
 
+INPUT_PATH = Path(__file__).parent / "input.txt"
 
-input_deck = load_file()
+# Highest number counted by bitmask - bitmask holds a bit for every number up to the highest one
+MAX_MASK_NUMBER = 1023
+
+# Rows read in place from a buffer
+CARD_ROW = re.compile(rb"Card +(\d+):([^|]*)\|(.*)")
+NUMBER = re.compile(rb"\d+")
 
 input_web_example = [
     "Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53",
@@ -31,77 +40,184 @@ class CardType(StrEnum):
     cope = "copy"
 
 
+@counted
+def numbers_mask(numbers: list[int]) -> int:
+    """
+    Integer bitmask of numbers - bit N is set when number N is present.
+
+    Example: [1, 3, 4] = 0b11010
+    """
+    mask = 0
+    for n in numbers:
+        mask |= 1 << n
+    return mask
+
+
+def count_matches(card_numbers: list[int], my_numbers: list[int]) -> int:
+    """
+    Distinct numbers present on both sides - popcount of bitmasks for small numbers.
+
+    Big or negative numbers (bitmask would need a bit for every number below them) are matched by set.
+    """
+    if all(0 <= n <= MAX_MASK_NUMBER for numbers in (card_numbers, my_numbers) for n in numbers):
+        return (numbers_mask(card_numbers) & numbers_mask(my_numbers)).bit_count()
+    return len(set(card_numbers) & set(my_numbers))
+
+
 class ScratchCard:
+    __slots__ = ("card_id", "card_numbers", "my_numbers", "type", "matches_count", "points")
+
     def __init__(self, card_id: int, card_numbers: list[int], my_numbers: list[int], card_type: CardType):
         self.card_id = card_id
         self.card_numbers = card_numbers
         self.my_numbers = my_numbers
         self.type = card_type
 
+        # Matches are resolved once - only their count is kept.
+        self.matches_count = count_matches(card_numbers, my_numbers)
+        self.points = 1 << (self.matches_count - 1) if self.matches_count else 0
+
     def __repr__(self):
         return f"Card({self.card_id})"  # , winning_nums: {self.winning_nums_count()})"  # card_nums: {self.card_numbers} my_nums: {self.my_numbers})"
 
     def __lt__(self, other: Self):
         return self.card_id < other.card_id
 
+    @counted
     def winning_nums(self) -> list[int]:
-        return [n for n in self.my_numbers if n in self.card_numbers]
+        card_numbers = set(self.card_numbers)
+        return [n for n in self.my_numbers if n in card_numbers]
 
     def winning_nums_count(self) -> int:
-        return len(self.winning_nums())
+        return self.matches_count
 
     def worth(self) -> int:
-        if self.winning_nums():
-            worth = 2
-            return pow(worth, len(self.winning_nums()) - 1)
-        return 0
+        return self.points
+
+
+class DeckSlice(Sequence):
+    """Read-only view of consecutive cards in the deck - nothing is copied"""
+
+    def __init__(self, cards: list[ScratchCard], start: int, stop: int):
+        self._cards = cards
+        self._range = range(start, stop)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, item: int | slice) -> ScratchCard | Self:
+        if isinstance(item, slice):
+            positions = self._range[item]
+            if positions.step != 1:
+                raise ValueError("DeckSlice supports only contiguous slices")
+            return DeckSlice(self._cards, positions.start, positions.stop)
+
+        return self._cards[self._range[item]]
+
+    def __repr__(self):
+        return f"DeckSlice({list(self)})"
 
 
 class CardDeck:
+    """
+    Cards ordered by card_id with card_id -> position index.
+
+    Ids don't have to be consecutive nor added in order. Cards are appended - a deck fed out of order is sorted
+    once, before it's read again.
+    """
+
     def __init__(self):
-        self.cards: list[ScratchCard] = []
+        self._cards: list[ScratchCard] = []
+        self._card_ids: list[int] = []
+        self._positions: dict[int, int] = {}
+        self._is_sorted = True
 
     def add_card(self, card: ScratchCard) -> None:
-        self.cards.append(card)
+        if card.card_id in self._positions:
+            raise ValueError(f"Card {card.card_id} is already in the deck")
+
+        if self._card_ids and card.card_id < self._card_ids[-1]:
+            self._is_sorted = False
+        self._positions[card.card_id] = len(self._cards)
+        self._cards.append(card)
+        self._card_ids.append(card.card_id)
+
+    def _sort(self) -> None:
+        if self._is_sorted:
+            return
+
+        self._cards.sort()
+        self._card_ids = [card.card_id for card in self._cards]
+        self._positions = {card_id: position for position, card_id in enumerate(self._card_ids)}
+        self._is_sorted = True
+
+    @property
+    def cards(self) -> list[ScratchCard]:
+        self._sort()
+        return self._cards
+
+    @property
+    def card_ids(self) -> list[int]:
+        self._sort()
+        return self._card_ids
+
+    @property
+    def positions(self) -> dict[int, int]:
+        self._sort()
+        return self._positions
 
     def deck_worth(self) -> int:
         return sum([card.worth() for card in self.cards])
 
-    def get_following_cards(self, current_card: int, num_of_following_cards: int) -> list[ScratchCard]:
-        return self.cards[current_card : current_card + num_of_following_cards]
+    def position(self, card_id: int) -> int:
+        return self.positions[card_id]
+
+    def get_card(self, card_id: int) -> ScratchCard:
+        return self.cards[self.positions[card_id]]
+
+    def following_positions(self, current_card: int, num_of_following_cards: int) -> range:
+        """
+        Positions of cards with id in range (current_card, current_card + num_of_following_cards>.
+
+        Missing ids are skipped. Example: deck 1, 2, 5, 6 -> card 2 winning 3 = cards 5
+        """
+        start = bisect_right(self.card_ids, current_card)
+        stop = bisect_right(self.card_ids, current_card + num_of_following_cards, lo=start)
+        return range(start, stop)
+
+    def get_following_cards(self, current_card: int, num_of_following_cards: int) -> DeckSlice:
+        positions = self.following_positions(current_card, num_of_following_cards)
+        return DeckSlice(self.cards, positions.start, positions.stop)
 
     def get_cards(self, card_ids: list[int]) -> list[ScratchCard]:
-        return [card for card in self.cards if card.card_id in card_ids]
+        return [self.cards[self.positions[card_id]] for card_id in card_ids if card_id in self.positions]
 
 
 class TheGame:
     def __init__(self, card_deck: CardDeck):
         self.deck: CardDeck = card_deck
-        self.copies: list[ScratchCard] = []
+        # Number of instances (original + copies) for every card. Index is the card position in the deck.
+        self.instances: list[int] = [1] * len(card_deck.cards)
 
     def num_of_copies(self, card_id: int) -> int:
-        return len([card for card in self.copies if card.card_id == card_id])
+        return self.card_instances(card_id) - 1
 
     def all_cards(self) -> list[ScratchCard]:
-        return sorted(self.deck.cards + self.copies)
+        """All cards in TheGame (copies included). Careful - materializes every single copy."""
+        return [card for card, count in zip(self.deck.cards, self.instances) for _ in range(count)]
 
     def card_instances(self, card_id: int) -> int:
-        return len(
-            [card for card in self.deck.cards if card.card_id == card_id]
-            + [card for card in self.copies if card.card_id == card_id]
-        )
+        return self.instances[self.deck.position(card_id)]
 
     def instances_sum(self) -> int:
         """Return SUM of all instances for every card in the deck!
 
         In the original deck. Not All cards (copies included) in TheGame.
         """
-        every_card_instance = []
-        for card in self.deck.cards:
-            every_card_instance.append(self.card_instances(card.card_id))
-        return sum(every_card_instance)
+        return sum(self.instances)
 
 
+@counted
 def card_factory(row: str) -> ScratchCard:
     card_left, card_right = re.split(":", row)
     card_id = card_left.split()[1].strip()
@@ -113,34 +229,156 @@ def card_factory(row: str) -> ScratchCard:
     return ScratchCard(card_id=int(card_id), card_numbers=card_nums, my_numbers=my_nums, card_type=CardType.original)
 
 
+@counted
+def buffer_card_factory(buffer: BufferT, start: int, end: int) -> ScratchCard:
+    """card_factory of the row buffer[start:end] - numbers are read in place, the row is never decoded"""
+    row = CARD_ROW.match(buffer, start, end)
+    if row is None:
+        raise ValueError(f"No card on offset {start}: {bytes(buffer[start:end])!r}")
+
+    card_nums = [int(n) for n in NUMBER.findall(buffer, *row.span(2))]
+    my_nums = [int(n) for n in NUMBER.findall(buffer, *row.span(3))]
+
+    return ScratchCard(card_id=int(row[1]), card_numbers=card_nums, my_numbers=my_nums, card_type=CardType.original)
+
+
+@stage("scratchcards.play")
 def play_the_game(the_game: TheGame):
-    for card in the_game.deck.cards:
-        copies_won = []
-        print(
-            ">",
-            card,
-            f"- wins: {card.winning_nums_count()}",
-            "- copies:",
-            the_game.num_of_copies(card_id=card.card_id),
-            "- instances:",
-            the_game.card_instances(card_id=card.card_id),
-        )
+    """
+    Propagate won copies through the deck in one pass.
+
+    Every instance of a card wins the same following cards, so instead of materializing copies
+    the instance count of the current card is added to each card in its winning window.
+
+    Example: Card 1 (1 instance) wins 4 -> Cards 2, 3, 4, 5 get +1 instance
+             Card 2 (2 instances) wins 2 -> Cards 3, 4 get +2 instances
+    """
+    cards = the_game.deck.cards
+    instances = the_game.instances = [1] * len(cards)
+    trace = logger.isEnabledFor(logging.DEBUG)
+
+    for position, card in enumerate(cards):
+        if trace:
+            logger.debug(
+                "> %s - wins: %s - copies: %s - instances: %s",
+                card,
+                card.winning_nums_count(),
+                the_game.num_of_copies(card_id=card.card_id),
+                the_game.card_instances(card_id=card.card_id),
+            )
         winning_numbers_count = card.winning_nums_count()
-        winning_copies = the_game.deck.get_following_cards(
+        winning_positions = the_game.deck.following_positions(
             current_card=card.card_id, num_of_following_cards=winning_numbers_count
         )
-        copies_won.extend(winning_copies)
 
-        for card_copy in the_game.copies:
-            if card_copy.card_id == card.card_id:
-                copies_won.extend(winning_copies)
+        for following_position in winning_positions:
+            instances[following_position] += instances[position]
 
-        the_game.copies.extend(copies_won)
+
+class ScratchcardStream:
+    """
+    Online evaluator - cards are fed one by one, deck worth and instances sum are running totals.
+
+    A card wins copies only of the next `matches` cards, so pending copies are kept in a ring buffer as long
+    as the maximum match count. Memory doesn't grow with the number of cards.
+
+    Example: Card 1 (1 instance) wins 4 -> pending [1, 1, 1, 1]
+             Card 2 (1 + 1 instances) wins 2 -> pending [3, 3, 1, 0]
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.pending: list[int] = [0] * max(capacity, 1)
+        self.head = 0
+        self.last_card_id: int | None = None
+        self.deck_worth = 0
+        self.instances_sum = 0
+
+    def _advance(self) -> int:
+        """Pop pending copies of the current card and move to the next one"""
+        copies = self.pending[self.head]
+        self.pending[self.head] = 0
+        self.head = (self.head + 1) % len(self.pending)
+        return copies
+
+    def _grow(self, capacity: int) -> None:
+        """Unroll the ring so head is on index 0 and make room for more cards"""
+        self.pending = self.pending[self.head :] + self.pending[: self.head] + [0] * (capacity - len(self.pending))
+        self.head = 0
+
+    def feed(self, card: ScratchCard) -> tuple[int, int]:
+        """Evaluate next card. Returns running (deck worth, instances sum)."""
+        if self.last_card_id is not None:
+            if card.card_id <= self.last_card_id:
+                raise ValueError(f"Card {card.card_id} came after card {self.last_card_id}, ids have to increase")
+
+            # Missing ids - copies won for them are dropped
+            for _ in range(min(card.card_id - self.last_card_id - 1, len(self.pending))):
+                self._advance()
+        self.last_card_id = card.card_id
+
+        instances = 1 + self._advance()
+        matches = card.winning_nums_count()
+        if matches > len(self.pending):
+            self._grow(matches)
+
+        capacity = len(self.pending)
+        for offset in range(matches):
+            self.pending[(self.head + offset) % capacity] += instances
+
+        self.deck_worth += card.worth()
+        self.instances_sum += instances
+        return self.deck_worth, self.instances_sum
+
+    def feed_line(self, row: str) -> None:
+        self.feed(card_factory(row))
+
+    def totals(self) -> dict[str, int]:
+        return {"part one": self.deck_worth, "part two": self.instances_sum}
+
+
+def stream_solver() -> ScratchcardStream:
+    return ScratchcardStream()
+
+
+def evaluate_stream(rows: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """Running (deck worth, instances sum) after every card - cards are never collected to a CardDeck"""
+    stream = ScratchcardStream()
+    for row in rows:
+        yield stream.feed(card_factory(row))
+
+
+@stage("scratchcards.parse")
+def parse(lines: Iterable[str]) -> CardDeck:
+    card_deck = CardDeck()
+    for row in lines:
+        card_deck.add_card(card=card_factory(row))
+    return card_deck
+
+
+@stage("scratchcards.parse")
+def parse_buffer(buffer: BufferT) -> CardDeck:
+    """Deck from the whole input in one buffer (bytes, memoryview, mmap...) - no str per row"""
+    card_deck = CardDeck()
+    for start, end in line_offsets(buffer):
+        card_deck.add_card(card=buffer_card_factory(buffer, start, end))
+    return card_deck
+
+
+@stage("scratchcards.solve")
+def part_one(card_deck: CardDeck) -> int:
+    return card_deck.deck_worth()
+
+
+@stage("scratchcards.solve")
+def part_two(card_deck: CardDeck) -> int:
+    the_game = TheGame(card_deck=card_deck)
+    play_the_game(the_game=the_game)
+    return the_game.instances_sum()
 
 
 if __name__ == "__main__":
     card_deck = CardDeck()
-    for row in input_deck:
+    for row in read_lines(INPUT_PATH):
         card_deck.add_card(card=card_factory(row))
 
     the_game = TheGame(card_deck=card_deck)
@@ -148,3 +386,6 @@ if __name__ == "__main__":
 
     print("Happy number 1:", card_deck.deck_worth())
     print("Happy number 2:", the_game.instances_sum())
+
+    with map_file(INPUT_PATH) as mapped_input:
+        print("Happy number 2 (buffer):", part_two(parse_buffer(mapped_input)))
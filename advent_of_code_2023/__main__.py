@@ -0,0 +1,207 @@
+"""
+Run solvers from one place.
+
+Example:
+    python -m advent_of_code_2023 run --day 4
+    python -m advent_of_code_2023 run --day 1 --part 2 --input calibration.txt
+    cat input.txt | python -m advent_of_code_2023 run --day 2 --input -
+    python -m advent_of_code_2023 run --day 4 -v  # trace the day's solver
+    python -m advent_of_code_2023 run --day 3 --profile  # profile-day3.pstats + profile-day3.json
+    python -m advent_of_code_2023 produce --day 4 --size 100000 | python -m advent_of_code_2023 ingest --day 4
+"""
+
+import argparse
+import contextlib
+import cProfile
+import logging
+import sys
+import time
+from pathlib import Path
+
+from advent_of_code_2023 import instrumentation
+from advent_of_code_2023.input_reader import STDIN, LineSource, map_file, read_lines
+from advent_of_code_2023.registry import PARTS, discover_solvers, load_solver
+
+
+def enable_trace(solver_name: str) -> None:
+    """Trace of one day only - other loggers stay quiet"""
+    logging.basicConfig(format="%(name)s: %(message)s")
+    logging.getLogger(solver_name).setLevel(logging.DEBUG)
+
+
+def run_parallel(day: int, parts: list[int], input_path: str | None, workers: int, verbose: bool = False) -> None:
+    """Parse and solve happen together in the workers - only solve time is reported"""
+    from advent_of_code_2023.parallel import solve_parallel
+
+    solver = load_solver(day)
+    if verbose:
+        enable_trace(solver.__name__)
+    source = input_path if input_path is not None else solver.INPUT_PATH
+    if str(source) == STDIN:
+        raise ValueError("Parallel mode needs an input file, stdin can't be memory-mapped")
+
+    total_start = time.perf_counter()
+    for part in parts:
+        solve_start = time.perf_counter()
+        answer = solve_parallel(solver=solver, part_name=PARTS[part], path=source, workers=workers)
+        solve_time = time.perf_counter() - solve_start
+        print(f"Day {day} part {part}: {answer}  (solve: {solve_time:.4f}s, workers: {workers})")
+
+    print(f"Day {day} total: {time.perf_counter() - total_start:.4f}s")
+
+
+def run(
+    day: int,
+    parts: list[int],
+    input_path: str | None,
+    use_mmap: bool,
+    verbose: bool = False,
+    profile_dir: Path | None = None,
+) -> None:
+    """With profile_dir, parse and solve run under cProfile and the stage timings + call counts are saved next to it"""
+    if profile_dir is not None:
+        # Before the solver is imported - @counted wraps functions at import time
+        instrumentation.enable()
+    solver = load_solver(day)
+    if verbose:
+        enable_trace(solver.__name__)
+    source = input_path if input_path is not None else solver.INPUT_PATH
+
+    profiler = cProfile.Profile() if profile_dir is not None else None
+    if profiler is not None:
+        profiler.enable()
+
+    timings = {}
+    total_start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        # Days with parse_buffer work on the memory-mapped input directly - no str per line
+        if use_mmap and hasattr(solver, "parse_buffer") and str(source) != STDIN:
+            parsed = solver.parse_buffer(stack.enter_context(map_file(source)))
+        elif str(source) == STDIN:
+            parsed = solver.parse(read_lines(source))
+        else:
+            # Days with independent lines can read the file again for every part instead of keeping it
+            parsed = solver.parse(LineSource(source, use_mmap=use_mmap))
+        timings["parse"] = time.perf_counter() - total_start
+        print(f"Day {day} parse: {timings['parse']:.4f}s")
+
+        for part in parts:
+            solve_start = time.perf_counter()
+            answer = getattr(solver, PARTS[part])(parsed)
+            timings[f"part {part}"] = time.perf_counter() - solve_start
+            print(f"Day {day} part {part}: {answer}  (solve: {timings[f'part {part}']:.4f}s)")
+
+    timings["total"] = time.perf_counter() - total_start
+    print(f"Day {day} total: {timings['total']:.4f}s")
+
+    if profiler is not None:
+        profiler.disable()
+        save_profile(profiler, profile_dir=profile_dir, day=day, timings=timings)
+
+
+def save_profile(profiler: cProfile.Profile, profile_dir: Path, day: int, timings: dict[str, float]) -> None:
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    stats_path = profile_dir / f"profile-day{day}.pstats"
+    summary_path = profile_dir / f"profile-day{day}.json"
+
+    profiler.dump_stats(stats_path)
+    instrumentation.write_summary(summary_path, day=day, timings=timings)
+    print(f"Profile: {stats_path} (python -m pstats {stats_path}), stages: {summary_path}")
+
+
+def run_ingest(day: int, socket_path: str | None, interval: float, queue_size: int | None = None) -> None:
+    """Solve records arriving over the Unix socket, or stdin pipe when no socket is given"""
+    import asyncio
+
+    from advent_of_code_2023 import ingest
+
+    solver = load_solver(day)
+    if not hasattr(solver, "stream_solver"):
+        raise ValueError(f"Day {day} has no stream solver")
+
+    options = {"interval": interval, "queue_size": queue_size if queue_size is not None else ingest.QUEUE_SIZE}
+    if socket_path is not None:
+        asyncio.run(ingest.ingest_socket(day, solver.stream_solver(), path=socket_path, **options))
+    else:
+        asyncio.run(ingest.ingest_pipe(day, solver.stream_solver(), **options))
+
+
+def run_producer(day: int, size: int, input_path: str | None, socket_path: str | None) -> None:
+    """Stand-in producer - input file or synthetic records of the day, served on the Unix socket or to stdout"""
+    import asyncio
+
+    from advent_of_code_2023 import ingest
+    from advent_of_code_2023.benchmarks.generators import generate
+
+    lines = read_lines(input_path) if input_path is not None else generate(day, size)
+    if socket_path is not None:
+        asyncio.run(ingest.serve_records(socket_path, lines))
+        return
+
+    sys.stdout.writelines(f"{line}\n" for line in lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="advent_of_code_2023")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Solve one day")
+    run_parser.add_argument("--day", type=int, required=True, choices=list(discover_solvers()))
+    run_parser.add_argument("--part", type=int, choices=list(PARTS), help="Both parts when not given")
+    run_parser.add_argument("--input", help="Input file, '-' for stdin. Day's input.txt when not given")
+    run_parser.add_argument(
+        "--mmap", action="store_true", help="Memory-map the input file. Days 1 and 4 solve the mapped buffer in place"
+    )
+    run_parser.add_argument("--workers", type=int, default=1, help="Processes for days 1, 2 and 3")
+    run_parser.add_argument("-v", "--verbose", action="store_true", help="Trace the day's solver")
+    run_parser.add_argument(
+        "--profile", action="store_true", help="Save cProfile stats and stage timings with call counts"
+    )
+    run_parser.add_argument("--profile-dir", type=Path, default=Path("."), help="Where --profile writes its files")
+
+    ingest_parser = commands.add_parser("ingest", help="Solve records streamed over a Unix socket or a pipe")
+    ingest_parser.add_argument("--day", type=int, required=True, choices=list(discover_solvers()))
+    ingest_parser.add_argument("--socket", help="Unix socket of the producer. Stdin pipe when not given")
+    ingest_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between running totals")
+    ingest_parser.add_argument(
+        "--queue-size", type=int, help="Records waiting for the solver before reading stops. 1024 when not given"
+    )
+
+    produce_parser = commands.add_parser("produce", help="Stand-in producer of records for ingest")
+    produce_parser.add_argument("--day", type=int, required=True, choices=list(discover_solvers()))
+    produce_parser.add_argument("--size", type=int, default=100_000, help="Number of synthetic records")
+    produce_parser.add_argument("--input", help="Serve this file instead of synthetic records")
+    produce_parser.add_argument("--socket", help="Serve records on this Unix socket. Stdout when not given")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        parts = [args.part] if args.part else list(PARTS)
+        if args.workers > 1:
+            if args.profile:
+                parser.error("--profile works in a single process only, drop --workers")
+            if args.input == STDIN:
+                parser.error("--workers needs an input file, stdin can't be memory-mapped")
+            solver = load_solver(args.day)
+            if not getattr(solver, "LINE_INDEPENDENT", False) and not hasattr(solver, "solve_byte_range"):
+                parser.error(f"Day {args.day} can't be split between workers, drop --workers")
+            run_parallel(day=args.day, parts=parts, input_path=args.input, workers=args.workers, verbose=args.verbose)
+        else:
+            run(
+                day=args.day,
+                parts=parts,
+                input_path=args.input,
+                use_mmap=args.mmap,
+                verbose=args.verbose,
+                profile_dir=args.profile_dir if args.profile else None,
+            )
+    elif args.command == "ingest":
+        if not hasattr(load_solver(args.day), "stream_solver"):
+            parser.error(f"Day {args.day} has no stream solver")
+        run_ingest(day=args.day, socket_path=args.socket, interval=args.interval, queue_size=args.queue_size)
+    elif args.command == "produce":
+        run_producer(day=args.day, size=args.size, input_path=args.input, socket_path=args.socket)
+
+
+if __name__ == "__main__":
+    main()
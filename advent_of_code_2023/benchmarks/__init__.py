@@ -0,0 +1,7 @@
+"""
+Benchmarks with seeded synthetic inputs for every day.
+
+Example:
+    python -m advent_of_code_2023.benchmarks run --max-exponent 5 --output before.json
+    python -m advent_of_code_2023.benchmarks compare before.json after.json
+"""
@@ -0,0 +1,45 @@
+import argparse
+
+from advent_of_code_2023.benchmarks.harness import compare_results, run_benchmarks, save_results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="advent_of_code_2023.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Benchmark solvers on synthetic inputs of 10^min..10^max units")
+    run_parser.add_argument(
+        "--day", type=int, action="append", dest="days", help="Repeat for more days. All by default"
+    )
+    run_parser.add_argument("--min-exponent", type=int, default=3)
+    run_parser.add_argument("--max-exponent", type=int, default=7)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=2023)
+    run_parser.add_argument("--output", default="benchmark_results.json")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=1.1, help="Ratio flagged as regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(
+            days=args.days,
+            min_exponent=args.min_exponent,
+            max_exponent=args.max_exponent,
+            repeat=args.repeat,
+            seed=args.seed,
+        )
+        save_results(results, args.output)
+        print("Results saved to", args.output)
+
+    elif args.command == "compare":
+        for row in compare_results(args.baseline, args.current):
+            flag = "  REGRESSION" if row["ratio"] > args.threshold else ""
+            print(f"Day {row['day']} size {row['size']:>9} {row['stage']:<9} x{row['ratio']:.2f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
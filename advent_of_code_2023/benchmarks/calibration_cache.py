@@ -0,0 +1,61 @@
+"""
+Hit rate and time of CalibrationCache on batches with repeated lines.
+
+Lines are drawn from a pool of unique lines with Zipf-like weights - few lines repeat a lot, most are rare.
+Two overlapping batches are processed, the second one with a fresh cache backed by the same SQLite file.
+
+Run: python -m advent_of_code_2023.benchmarks.calibration_cache
+"""
+
+import importlib
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from advent_of_code_2023.benchmarks.generators import calibration_lines
+
+trebuchet = importlib.import_module("advent_of_code_2023.01_trebuchet.solution")
+
+
+def batch_with_duplicates(pool: list[str], size: int, skew: float = 1.1, seed: int = 2023) -> list[str]:
+    rng = random.Random(seed)
+    weights = [1 / rank**skew for rank in range(1, len(pool) + 1)]
+    return rng.choices(pool, weights=weights, k=size)
+
+
+def timed(label: str, batch: list[str], cache=None) -> int:
+    start = time.perf_counter()
+    result = trebuchet.sum_calibration_values(batch, matcher=trebuchet.DigitMatcher(), cache=cache)
+    elapsed = time.perf_counter() - start
+
+    stats = ""
+    if cache is not None:
+        cache_stats = cache.stats()
+        stats = (
+            f"  hit rate: {cache_stats['hit_rate']:.1%}  (memory {cache_stats['hits']},"
+            f" disk {cache_stats['disk_hits']}, miss {cache_stats['misses']}, evicted {cache_stats['evictions']})"
+        )
+    print(f"{label:<28} lines: {len(batch)}  time: {elapsed:.4f}s{stats}")
+    return result
+
+
+if __name__ == "__main__":
+    pool = list(calibration_lines(50_000))
+    first_batch = batch_with_duplicates(pool, size=200_000, seed=1)
+    second_batch = batch_with_duplicates(pool, size=200_000, seed=2)
+
+    expected = timed("no cache", first_batch)
+
+    with trebuchet.CalibrationCache(maxsize=10_000) as cache:
+        if timed("memory LRU (10k)", first_batch, cache=cache) != expected:
+            raise ValueError("Cached result differs")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "calibration.sqlite"
+        with trebuchet.CalibrationCache(maxsize=10_000, path=path) as cache:
+            timed("batch 1 - LRU + SQLite", first_batch, cache=cache)
+
+        # Fresh process memory - only the SQLite file is shared
+        with trebuchet.CalibrationCache(maxsize=10_000, path=path) as cache:
+            timed("batch 2 - LRU + SQLite", second_batch, cache=cache)
@@ -0,0 +1,96 @@
+"""
+Per-character cost of the exception driven is_int checks (previous implementation) and bulk classification.
+
+- classify: is_int on every character / bytes.translate of the whole line
+- digit runs: character loop / bytes.find on the classified line
+- calibration digits (part one): automaton of digits / bytes.find and rfind on the classified line
+
+Run: python -m advent_of_code_2023.benchmarks.char_classes
+"""
+
+import importlib
+import time
+
+from advent_of_code_2023.benchmarks.generators import calibration_lines, engine_schematic
+from advent_of_code_2023.char_classes import DIGIT, classify, digit_runs
+
+trebuchet = importlib.import_module("advent_of_code_2023.01_trebuchet.solution")
+
+REPEAT = 3
+
+
+def is_int(val) -> bool:
+    """Previous implementation - int() raises on every non-digit"""
+    if val is None:
+        return False
+
+    try:
+        int(val)
+        return True
+    except ValueError:
+        return False
+
+
+def classify_by_exceptions(lines: list[str]) -> int:
+    return sum(is_int(char) for line in lines for char in line)
+
+
+def classify_by_translate(lines: list[str]) -> int:
+    return sum(classify(line).count(DIGIT) for line in lines)
+
+
+def digit_runs_by_loop(lines: list[str]) -> int:
+    runs = 0
+    for line in lines:
+        in_run = False
+        for char in line:
+            if is_int(char):
+                runs += not in_run
+                in_run = True
+            else:
+                in_run = False
+    return runs
+
+
+def digit_runs_by_find(lines: list[str]) -> int:
+    return sum(1 for line in lines for _ in digit_runs(classify(line)))
+
+
+def calibration_by_automaton(lines: list[str]) -> int:
+    matcher = trebuchet.DigitMatcher(word_table={})
+    return sum(int(f"{matcher.scan_first(line)}{matcher.scan_last(line)}") for line in lines)
+
+
+def calibration_by_classes(lines: list[str]) -> int:
+    matcher = trebuchet.DigitMatcher(word_table={})
+    return sum(trebuchet.calibration_value(line, matcher) for line in lines)
+
+
+def ns_per_char(func, lines: list[str]) -> tuple[float, int]:
+    num_of_chars = sum(len(line) for line in lines)
+    best = float("inf")
+    result = 0
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(lines)
+        best = min(best, time.perf_counter() - start)
+    return best / num_of_chars * 1e9, result
+
+
+def compare(label: str, old_func, new_func, lines: list[str]) -> None:
+    old_cost, old_result = ns_per_char(old_func, lines)
+    new_cost, new_result = ns_per_char(new_func, lines)
+    if old_result != new_result:
+        raise ValueError(f"{label}: results differ {old_result} != {new_result}")
+    print(f"{label:<20}{old_cost:>12.1f}ns{new_cost:>12.1f}ns{old_cost / new_cost:>9.1f}x")
+
+
+if __name__ == "__main__":
+    calibration = list(calibration_lines(100_000))
+    schematic = list(engine_schematic(height=1_000, width=1_000))
+
+    print(f"{'ns per char':<20}{'old':>14}{'new':>14}{'speedup':>10}")
+    compare("classify (day 1)", classify_by_exceptions, classify_by_translate, calibration)
+    compare("classify (day 3)", classify_by_exceptions, classify_by_translate, schematic)
+    compare("digit runs (day 3)", digit_runs_by_loop, digit_runs_by_find, schematic)
+    compare("calibration digits", calibration_by_automaton, calibration_by_classes, calibration)
@@ -0,0 +1,130 @@
+"""
+Seeded generators of synthetic puzzle inputs. Same seed = same input.
+
+Every generator yields lines, the same shape as input.txt of the day.
+"""
+
+import random
+from typing import Iterator
+
+DIGIT_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+OVERLAPPING_WORDS = ["eightwo", "oneight", "twone", "threeight", "fiveight", "sevenine", "nineight", "eighthree"]
+SYMBOLS = "*#+$/@%=&-"
+
+
+def calibration_lines(
+    num_of_lines: int, tokens_per_line: int = 6, overlap_probability: float = 0.2, seed: int = 2023
+) -> Iterator[str]:
+    """
+    Messed calibration lines - random letters, digits, digit words and overlapping words.
+
+    Every line holds at least one digit. Example: xkeightwo3nineqz
+    """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    for _ in range(num_of_lines):
+        tokens = [str(rng.randint(1, 9))]
+        for _ in range(tokens_per_line - 1):
+            roll = rng.random()
+            if roll < overlap_probability:
+                tokens.append(rng.choice(OVERLAPPING_WORDS))
+            elif roll < 0.5:
+                tokens.append(rng.choice(DIGIT_WORDS))
+            elif roll < 0.6:
+                tokens.append(str(rng.randint(1, 9)))
+            else:
+                tokens.append("".join(rng.choices(letters, k=rng.randint(1, 4))))
+
+        rng.shuffle(tokens)
+        yield "".join(tokens)
+
+
+def game_records(num_of_games: int, max_sets: int = 6, max_count: int = 20, seed: int = 2023) -> Iterator[str]:
+    """
+    Cube game records with 1..max_sets sets, every color revealed 1..max_count times.
+
+    Example: Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green
+    """
+    rng = random.Random(seed)
+    colors = ["red", "green", "blue"]
+
+    for game_id in range(1, num_of_games + 1):
+        game_sets = []
+        for _ in range(rng.randint(1, max_sets)):
+            revealed = rng.sample(colors, rng.randint(1, len(colors)))
+            game_sets.append(", ".join(f"{rng.randint(1, max_count)} {color}" for color in revealed))
+
+        yield f"Game {game_id}: {'; '.join(game_sets)}"
+
+
+def engine_schematic(
+    height: int, width: int, symbol_density: float = 0.05, number_density: float = 0.15, seed: int = 2023
+) -> Iterator[str]:
+    """
+    Engine schematic rows of given size. Numbers are 1..3 digits long, separated by at least one cell.
+
+    Example: 467..114..
+    """
+    rng = random.Random(seed)
+
+    for _ in range(height):
+        row = []
+        while len(row) < width:
+            roll = rng.random()
+            if roll < number_density:
+                row.extend(str(rng.randint(1, 999)))
+                row.append(".")
+            elif roll < number_density + symbol_density:
+                row.append(rng.choice(SYMBOLS))
+            else:
+                row.append(".")
+
+        yield "".join(row[:width])
+
+
+def scratchcard_deck(
+    num_of_cards: int,
+    card_numbers: int = 5,
+    my_numbers: int = 8,
+    match_weights: tuple[float, ...] = (8, 4, 2, 1, 0.5, 0.25),
+    seed: int = 2023,
+) -> Iterator[str]:
+    """
+    Scratchcards with tunable match distribution - match_weights[k] is relative weight of k matching numbers.
+
+    Example: Card 1: 41 48 83 86 17 | 83 86  6 31 17  9 48 53
+    """
+    rng = random.Random(seed)
+    matches = list(range(min(len(match_weights), card_numbers + 1)))
+    weights = match_weights[: len(matches)]
+
+    for card_id in range(1, num_of_cards + 1):
+        winning = rng.sample(range(1, 100), card_numbers)
+        matching = rng.sample(winning, rng.choices(matches, weights=weights)[0])
+        others = rng.sample([n for n in range(1, 100) if n not in winning], my_numbers - len(matching))
+        mine = matching + others
+        rng.shuffle(mine)
+
+        yield (
+            f"Card {card_id}: {' '.join(f'{n:>2}' for n in winning)} | {' '.join(f'{n:>2}' for n in mine)}"
+        )
+
+
+def generate(day: int, size: int, seed: int = 2023) -> Iterator[str]:
+    """
+    Input of given size for the day.
+
+    Size is number of lines for days 1, 2 and 4 and number of cells for day 3 (square-ish grid).
+    """
+    if day == 1:
+        return calibration_lines(size, seed=seed)
+    if day == 2:
+        return game_records(size, seed=seed)
+    if day == 3:
+        side = max(int(size**0.5), 1)
+        return engine_schematic(height=max(size // side, 1), width=side, seed=seed)
+    if day == 4:
+        return scratchcard_deck(size, seed=seed)
+
+    raise ValueError(f"No input generator for day {day}")
@@ -0,0 +1,102 @@
+"""
+Time parse and both parts of every day's solver on synthetic inputs of growing size.
+
+Results are saved as JSON - two result files can be compared to spot regressions between versions.
+"""
+
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from advent_of_code_2023.benchmarks.generators import generate
+from advent_of_code_2023.registry import PARTS, discover_solvers, load_solver
+
+STAGES = ["parse", *PARTS.values()]
+
+
+def best_time(func, *args, repeat: int) -> tuple[float, object]:
+    """Fastest of `repeat` runs and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_day(day: int, size: int, repeat: int = 3, seed: int = 2023) -> dict:
+    solver = load_solver(day)
+    lines = list(generate(day, size, seed=seed))
+
+    timings = {}
+    timings["parse"], parsed = best_time(solver.parse, lines, repeat=repeat)
+    for part_name in PARTS.values():
+        timings[part_name], _ = best_time(getattr(solver, part_name), parsed, repeat=repeat)
+
+    return {"day": day, "size": size, "seconds": timings}
+
+
+def git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def run_benchmarks(
+    days: list[int] | None = None, min_exponent: int = 3, max_exponent: int = 7, repeat: int = 3, seed: int = 2023
+) -> dict:
+    days = days or list(discover_solvers())
+    results = []
+
+    for day in days:
+        for exponent in range(min_exponent, max_exponent + 1):
+            result = benchmark_day(day=day, size=10**exponent, repeat=repeat, seed=seed)
+            results.append(result)
+            stage_times = "  ".join(f"{stage}: {seconds:.4f}s" for stage, seconds in result["seconds"].items())
+            print(f"Day {day} size 10^{exponent}  {stage_times}")
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: str | Path) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def compare_results(baseline_path: str | Path, current_path: str | Path) -> list[dict]:
+    """Current / baseline time ratio for every day, size and stage present in both files. Above 1 = slower."""
+    with open(baseline_path) as f:
+        baseline = {(result["day"], result["size"]): result["seconds"] for result in json.load(f)["results"]}
+    with open(current_path) as f:
+        current = {(result["day"], result["size"]): result["seconds"] for result in json.load(f)["results"]}
+
+    comparison = []
+    for (day, size), seconds in current.items():
+        if (day, size) not in baseline:
+            continue
+
+        for stage in STAGES:
+            before, after = baseline[(day, size)].get(stage), seconds.get(stage)
+            if before and after is not None:
+                comparison.append({"day": day, "size": size, "stage": stage, "ratio": after / before})
+
+    return comparison
@@ -0,0 +1,69 @@
+"""
+Bytes per object of the core data model - __slots__ classes compared with the same classes backed by __dict__.
+
+Run: python -m advent_of_code_2023.benchmarks.memory
+"""
+
+import importlib
+import tracemalloc
+
+cube_conundrum = importlib.import_module("advent_of_code_2023.02_cube_conundrum.solution")
+gear_ratios = importlib.import_module("advent_of_code_2023.03_gear_ratios.solution")
+scratchcards = importlib.import_module("advent_of_code_2023.04_scratchcards.solution")
+
+NUM_OF_OBJECTS = 100_000
+
+
+def with_dict(cls: type) -> type:
+    """Same class without __slots__ - attributes live in the instance __dict__ again"""
+    skipped = {"__slots__", "__dict__", "__weakref__", *cls.__slots__}
+    namespace = {name: value for name, value in vars(cls).items() if name not in skipped}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def bytes_per_object(factory, num_of_objects: int = NUM_OF_OBJECTS) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = [factory() for _ in range(num_of_objects)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del objects
+    return (after - before) / num_of_objects
+
+
+def factories(position_cls, node_cls, game_set_cls, cube_game_cls, scratch_card_cls) -> dict:
+    card_numbers = [41, 48, 83, 86, 17]
+    my_numbers = [83, 86, 6, 31, 17, 9, 48, 53]
+    position = position_cls(row_number=0, start_index=0, end_index=2)
+
+    return {
+        "NodePosition": lambda: position_cls(row_number=0, start_index=0, end_index=2),
+        "Node": lambda: node_cls(value=467, node_type=gear_ratios.NodeTypeEnum.num, position=position),
+        "GameSet": lambda: game_set_cls(revealed_order=0),
+        "CubeGame": lambda: cube_game_cls(game_number=1),
+        "ScratchCard": lambda: scratch_card_cls(
+            card_id=1, card_numbers=card_numbers, my_numbers=my_numbers, card_type=scratchcards.CardType.original
+        ),
+    }
+
+
+if __name__ == "__main__":
+    slotted = factories(
+        gear_ratios.NodePosition,
+        gear_ratios.Node,
+        cube_conundrum.GameSet,
+        cube_conundrum.CubeGame,
+        scratchcards.ScratchCard,
+    )
+    dict_backed = factories(
+        with_dict(gear_ratios.NodePosition),
+        with_dict(gear_ratios.Node),
+        with_dict(cube_conundrum.GameSet),
+        with_dict(cube_conundrum.CubeGame),
+        with_dict(scratchcards.ScratchCard),
+    )
+
+    print(f"{'class':<14}{'__dict__':>12}{'__slots__':>12}")
+    for name, factory in slotted.items():
+        print(f"{name:<14}{bytes_per_object(dict_backed[name]):>11.0f}B{bytes_per_object(factory):>11.0f}B")
@@ -0,0 +1,61 @@
+"""
+Compare materialized copies (previous implementation) with instance counting on a synthetic deck.
+
+Run: python -m advent_of_code_2023.benchmarks.scratchcard_copies
+"""
+
+import importlib
+import time
+
+from advent_of_code_2023.benchmarks.generators import scratchcard_deck
+
+scratchcards = importlib.import_module("advent_of_code_2023.04_scratchcards.solution")
+CardDeck = scratchcards.CardDeck
+ScratchCard = scratchcards.ScratchCard
+
+
+def synthetic_deck(num_of_cards: int, seed: int = 2023) -> CardDeck:
+    """Deck where most cards win 1-2 copies - copies pile up quickly."""
+    return scratchcards.parse(scratchcard_deck(num_of_cards, match_weights=(4, 6, 4, 1), seed=seed))
+
+
+def play_the_game_materialized(card_deck: CardDeck) -> int:
+    """Previous implementation - every won copy is a ScratchCard in one list, rescanned for every card."""
+    copies: list[ScratchCard] = []
+    for card in card_deck.cards:
+        copies_won = []
+        winning_copies = card_deck.get_following_cards(
+            current_card=card.card_id, num_of_following_cards=card.winning_nums_count()
+        )
+        copies_won.extend(winning_copies)
+
+        for card_copy in copies:
+            if card_copy.card_id == card.card_id:
+                copies_won.extend(winning_copies)
+
+        copies.extend(copies_won)
+
+    return len(card_deck.cards) + len(copies)
+
+
+def play_the_game_counted(card_deck: CardDeck) -> int:
+    return scratchcards.part_two(card_deck)
+
+
+def timed(label: str, func, card_deck: CardDeck) -> int:
+    start = time.perf_counter()
+    result = func(card_deck)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} cards: {len(card_deck.cards):>7}  instances: {result:>10}  time: {elapsed:.4f}s")
+    return result
+
+
+if __name__ == "__main__":
+    for size in (50, 100, 150):
+        deck = synthetic_deck(size)
+        materialized = timed("materialized", play_the_game_materialized, deck)
+        counted = timed("counted", play_the_game_counted, deck)
+        if materialized != counted:
+            raise ValueError(f"Results differ for {size} cards: {materialized} != {counted}")
+
+    timed("counted", play_the_game_counted, synthetic_deck(100_000))
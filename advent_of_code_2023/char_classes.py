@@ -0,0 +1,84 @@
+"""
+Character classes of whole lines in bulk - one bytes.translate call instead of a check per character.
+
+Every character is mapped to the code of its class:
+- DIGIT   0-9
+- DOT     .
+- SYMBOL  anything else (letters included)
+
+Class codes are single bytes, so the classified line is searched with bytes.find/rfind in C.
+
+Buffers (mmap, memoryview...) are not classified - translate would copy them. find_digit/rfind_digit search a range
+of the buffer in place instead.
+
+Example:
+    classify("467..114*#")             # b"ddd..dddss"
+    classify("two1nine").find(DIGIT)   # 3
+    list(digit_runs(b"ddd..ddd.."))    # [(0, 3), (5, 8)]
+"""
+
+import re
+from typing import Iterator
+
+DIGIT = ord("d")
+DOT = ord(".")
+SYMBOL = ord("s")
+
+DIGITS = b"0123456789"
+NOT_SYMBOL = DIGITS + b"."
+
+# Run of DIGIT class codes in classified line
+DIGIT_RUN = re.compile(b"%c+" % DIGIT)
+FIRST_DIGIT = re.compile(rb"[0-9]")
+# Greedy - backtracks from the end of the range to the last digit
+LAST_DIGIT = re.compile(rb"(?s).*([0-9])")
+
+# Byte -> class code
+CLASS_TABLE = bytes(DIGIT if byte in DIGITS else DOT if byte == DOT else SYMBOL for byte in range(256))
+
+
+class _UnicodeClassTable(dict):
+    """str.translate table - code points out of the byte table are symbols"""
+
+    def __missing__(self, code_point: int) -> int:
+        return SYMBOL
+
+
+_UNICODE_CLASS_TABLE = _UnicodeClassTable(enumerate(CLASS_TABLE))
+
+
+def classify(text: str | bytes) -> bytes:
+    """Class code of every character. Same length as the text - indexes are shared."""
+    if isinstance(text, str):
+        if not text.isascii():
+            return text.translate(_UNICODE_CLASS_TABLE).encode("ascii")
+        text = text.encode("ascii")
+
+    return text.translate(CLASS_TABLE)
+
+
+def digit_runs(classes: bytes) -> Iterator[tuple[int, int]]:
+    """
+    (start, end) of every run of digits in classified line. End is exclusive.
+
+    Every run is one regex match - the line is scanned once, whatever the symbols around.
+    """
+    for match in DIGIT_RUN.finditer(classes):
+        yield match.span()
+
+
+def has_symbol(segment: bytes) -> bool:
+    """Anything left after deleting digits and dots is a symbol"""
+    return bool(segment.translate(None, NOT_SYMBOL))
+
+
+def find_digit(buffer, start: int = 0, end: int | None = None) -> int:
+    """Index of the first digit in buffer[start:end], -1 when there is none"""
+    match = FIRST_DIGIT.search(buffer, start, len(buffer) if end is None else end)
+    return match.start() if match is not None else -1
+
+
+def rfind_digit(buffer, start: int = 0, end: int | None = None) -> int:
+    """Index of the last digit in buffer[start:end], -1 when there is none"""
+    match = LAST_DIGIT.match(buffer, start, len(buffer) if end is None else end)
+    return match.start(1) if match is not None else -1
@@ -0,0 +1,166 @@
+"""
+Asyncio ingestion - records arrive over a Unix socket or a pipe and are fed to the day's stream solver one by one.
+
+  reader (asyncio.StreamReader) > bounded queue > stream solver (feed_line)
+                                                    > publisher - running totals every interval
+
+Backpressure: when the solver falls behind, the queue fills up and the reader waits on queue.put. Nothing is read
+from the socket/pipe meanwhile, its kernel buffer fills up and the producer is blocked on write.
+
+Stand-in producer serves lines on a Unix socket - synthetic records of the day or a file.
+
+Example:
+    python -m advent_of_code_2023 produce --day 4 --size 100000 --socket /tmp/cards.sock &
+    python -m advent_of_code_2023 ingest --day 4 --socket /tmp/cards.sock --interval 0.5
+
+    python -m advent_of_code_2023 produce --day 2 --size 100000 | python -m advent_of_code_2023 ingest --day 2
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import IO, Iterable, TextIO
+
+# Lines waiting for the solver - reader stops reading when it's full
+QUEUE_SIZE = 1024
+# Solver hands over to the event loop after that many records - the publisher would never run otherwise
+YIELD_EVERY = 256
+# Lines written by the stand-in producer before it waits for the socket buffer to drain
+PRODUCER_BATCH = 256
+
+# End of stream mark in the queue
+_END = None
+
+
+class IngestStats:
+    def __init__(self):
+        self.records = 0
+        self.started = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def records_per_second(self) -> float:
+        elapsed = self.elapsed()
+        return self.records / elapsed if elapsed else 0.0
+
+
+async def read_records(reader: asyncio.StreamReader, queue: asyncio.Queue) -> None:
+    """Stripped lines to the queue, blank lines are skipped. Waits when the queue is full."""
+    while line := await reader.readline():
+        record = line.decode().strip()
+        if record:
+            await queue.put(record)
+
+    await queue.put(_END)
+
+
+async def solve_records(queue: asyncio.Queue, solver, stats: IngestStats) -> None:
+    while (record := await queue.get()) is not _END:
+        solver.feed_line(record)
+        stats.records += 1
+        if not stats.records % YIELD_EVERY:
+            await asyncio.sleep(0)
+
+
+def report(day: int, solver, stats: IngestStats, queue: asyncio.Queue, output: TextIO) -> None:
+    totals = "  ".join(f"{name}: {total}" for name, total in solver.totals().items())
+    print(
+        f"Day {day} records: {stats.records}  ({stats.records_per_second():.0f} records/s, "
+        f"queue {queue.qsize()}/{queue.maxsize})  {totals}",
+        file=output,
+        flush=True,
+    )
+
+
+async def publish(day: int, solver, stats: IngestStats, queue: asyncio.Queue, interval: float, output: TextIO):
+    while True:
+        await asyncio.sleep(interval)
+        report(day, solver, stats, queue, output)
+
+
+async def ingest(
+    day: int,
+    solver,
+    reader: asyncio.StreamReader,
+    interval: float = 1.0,
+    queue_size: int = QUEUE_SIZE,
+    output: TextIO = sys.stdout,
+) -> dict[str, int]:
+    """Feed every record of the reader to the solver. Final totals are reported and returned."""
+    queue = asyncio.Queue(maxsize=queue_size)
+    stats = IngestStats()
+
+    publisher = asyncio.create_task(publish(day, solver, stats, queue, interval, output))
+    tasks = [
+        asyncio.create_task(read_records(reader, queue)),
+        asyncio.create_task(solve_records(queue, solver, stats)),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            # Error of reading or solving - the other one is cancelled below
+            task.result()
+    finally:
+        publisher.cancel()
+        for task in tasks:
+            task.cancel()
+
+    report(day, solver, stats, queue, output)
+    return solver.totals()
+
+
+async def open_pipe(pipe: IO) -> asyncio.StreamReader:
+    """StreamReader of a pipe (stdin, named pipe). Regular files can't be read by the event loop."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader
+
+
+async def ingest_socket(day: int, solver, path: str | Path, **options) -> dict[str, int]:
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        return await ingest(day, solver, reader, **options)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def ingest_pipe(day: int, solver, pipe: IO = sys.stdin, **options) -> dict[str, int]:
+    return await ingest(day, solver, await open_pipe(pipe), **options)
+
+
+async def serve_records(path: str | Path, lines: Iterable[str], ready: asyncio.Event | None = None) -> None:
+    """
+    Stand-in producer - serve lines to the first client connected to the Unix socket, then stop.
+
+    Lines are written in batches, every batch waits until the socket buffer drains (client's backpressure).
+    """
+    served = asyncio.Event()
+
+    async def handle_client(_reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) == PRODUCER_BATCH:
+                writer.write(("\n".join(batch) + "\n").encode())
+                await writer.drain()
+                batch = []
+
+        if batch:
+            writer.write(("\n".join(batch) + "\n").encode())
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+        served.set()
+
+    server = await asyncio.start_unix_server(handle_client, path=path)
+    try:
+        async with server:
+            if ready is not None:
+                ready.set()
+            await served.wait()
+    finally:
+        Path(path).unlink(missing_ok=True)
@@ -0,0 +1,212 @@
+"""
+Streaming input layer shared by every day.
+
+Lines are yielded lazily - the input is read and decoded in chunks, never held in memory at once.
+
+Example:
+    for line in read_lines("input.txt"):
+        ...
+    for line in read_lines("-"):  # stdin
+        ...
+    for line in read_lines("input.txt", use_mmap=True):
+        ...
+
+Zero-copy alternative - the whole input as one buffer and (start, end) offsets of its lines, no str per line:
+    with map_file("input.txt") as buffer:
+        for start, end in line_offsets(buffer):
+            ...
+"""
+
+import codecs
+import contextlib
+import mmap
+import re
+import sys
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+STDIN = "-"
+CHUNK_SIZE = 1 << 16
+
+BufferT = bytes | bytearray | memoryview | mmap.mmap
+BUFFER_TYPES = (bytes, bytearray, memoryview, mmap.mmap)
+NEW_LINE = re.compile(rb"\n")
+WHITESPACE = b" \t\r\n\x0b\x0c"
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = CHUNK_SIZE, limit: int | None = None) -> Iterator[bytes]:
+    """Read binary stream chunk by chunk. Stop after `limit` bytes when given."""
+    while limit is None or limit > 0:
+        chunk = stream.read(chunk_size if limit is None else min(chunk_size, limit))
+        if not chunk:
+            return
+
+        if limit is not None:
+            limit -= len(chunk)
+        yield chunk
+
+
+def iter_lines(stream: BinaryIO, chunk_size: int = CHUNK_SIZE, limit: int | None = None) -> Iterator[str]:
+    """
+    Read binary stream chunk by chunk, decode every chunk at once and yield stripped lines.
+
+    A line split between two chunks is carried over to the next one.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+
+    for chunk in iter_chunks(stream, chunk_size=chunk_size, limit=limit):
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        # Last line might be incomplete...wait for the next chunk.
+        pending = lines.pop()
+        for line in lines:
+            yield line.strip()
+
+    pending += decoder.decode(b"", final=True)
+    # Input ending with a new line has nothing pending.
+    if pending:
+        yield pending.strip()
+
+
+def read_file_lines(path: str | Path, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    with open(path, "rb") as f:
+        yield from iter_lines(f, chunk_size=chunk_size)
+
+
+def read_mmap_lines(
+    path: str | Path, chunk_size: int = CHUNK_SIZE, start: int = 0, end: int | None = None
+) -> Iterator[str]:
+    """Lines of memory-mapped file. Only bytes from start to end when given - they should be on line boundaries."""
+    with open(path, "rb") as f:
+        # Empty file can't be memory-mapped
+        if not Path(path).stat().st_size:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            mapped.seek(start)
+            limit = end - start if end is not None else None
+            yield from iter_lines(mapped, chunk_size=chunk_size, limit=limit)
+
+
+def line_boundaries(path: str | Path, num_of_chunks: int) -> list[tuple[int, int]]:
+    """
+    Split file to (start, end) byte ranges of roughly same size. Every range ends right after a new line.
+
+    Example: b"ab\ncd\nef" in 2 chunks = [(0, 6), (6, 8)]
+    """
+    size = Path(path).stat().st_size
+    if not size:
+        return []
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        boundaries = [0]
+        for chunk_index in range(1, num_of_chunks):
+            new_line = mapped.find(b"\n", max(size * chunk_index // num_of_chunks, boundaries[-1]))
+            if new_line == -1:
+                break
+            if new_line + 1 > boundaries[-1]:
+                boundaries.append(new_line + 1)
+
+    if boundaries[-1] != size:
+        boundaries.append(size)
+
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def count_lines(buffer: BufferT, start: int = 0, end: int | None = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """New lines in buffer[start:end] - counted chunk by chunk, the range is never copied at once"""
+    end = len(buffer) if end is None else end
+    return sum(
+        bytes(buffer[position : min(position + chunk_size, end)]).count(b"\n")
+        for position in range(start, end, chunk_size)
+    )
+
+
+def read_stdin_lines(chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    yield from iter_lines(sys.stdin.buffer, chunk_size=chunk_size)
+
+
+def read_lines(source: str | Path, use_mmap: bool = False, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield lines from file path, memory-mapped file path or stdin ("-")"""
+    if str(source) == STDIN:
+        return read_stdin_lines(chunk_size=chunk_size)
+
+    if use_mmap:
+        return read_mmap_lines(source, chunk_size=chunk_size)
+
+    return read_file_lines(source, chunk_size=chunk_size)
+
+
+class LineSource:
+    """
+    Lines of a file read again on every iteration - nothing is held in memory between passes.
+
+    Example:
+        lines = LineSource("input.txt")
+        part_one(lines), part_two(lines)  # file is read twice, line by line
+    """
+
+    def __init__(self, path: str | Path, use_mmap: bool = False, chunk_size: int = CHUNK_SIZE):
+        if str(path) == STDIN:
+            raise ValueError("Stdin can't be read again, use read_lines")
+
+        self.path = path
+        self.use_mmap = use_mmap
+        self.chunk_size = chunk_size
+
+    def __iter__(self) -> Iterator[str]:
+        return read_lines(self.path, use_mmap=self.use_mmap, chunk_size=self.chunk_size)
+
+
+def is_buffer(document) -> bool:
+    return isinstance(document, BUFFER_TYPES)
+
+
+@contextlib.contextmanager
+def map_file(path: str | Path) -> Iterator[BufferT]:
+    """Whole file as read-only memory-mapped buffer"""
+    with open(path, "rb") as f:
+        # Empty file can't be memory-mapped
+        if not Path(path).stat().st_size:
+            yield b""
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def line_offsets(buffer: BufferT, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int]]:
+    """
+    (start, end) offsets of every line in the buffer - stripped, same as lines of read_lines. Nothing is copied.
+
+    New lines are found by find() of the buffer. memoryview has none - regex search reads it in place instead.
+
+    Example: b"ab\n cd \n" = (0, 2), (4, 6)
+    """
+    end = len(buffer) if end is None else end
+    if hasattr(buffer, "find"):
+
+        def find_new_line(position: int) -> int:
+            return buffer.find(b"\n", position, end)
+
+    else:
+
+        def find_new_line(position: int) -> int:
+            match = NEW_LINE.search(buffer, position, end)
+            return match.start() if match is not None else -1
+
+    line_start = start
+    while line_start < end:
+        line_end = find_new_line(line_start)
+        next_line_start = line_end + 1
+        # Input without new line at the end
+        if line_end == -1:
+            line_end = next_line_start = end
+
+        while line_start < line_end and buffer[line_start] in WHITESPACE:
+            line_start += 1
+        while line_end > line_start and buffer[line_end - 1] in WHITESPACE:
+            line_end -= 1
+
+        yield line_start, line_end
+        line_start = next_line_start
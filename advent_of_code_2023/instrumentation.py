@@ -0,0 +1,88 @@
+"""
+Per-stage timing and call counting of hot functions.
+
+Instrumentation is off by default and costs nothing then:
+- @counted returns the function untouched unless instrumentation was enabled before the module was imported.
+- stage() only checks a flag.
+
+Example:
+    @counted
+    def localize_node(...): ...
+
+    @stage("gear_ratios.index")
+    def build_index(...): ...
+
+    with stage("gear_ratios.solve"):
+        ...
+
+    enable()  # before the day module is imported
+    ...
+    summary()  # {"stages": {...}, "calls": {...}}
+"""
+
+import contextlib
+import functools
+import json
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+_enabled = False
+_stages: dict[str, dict[str, float]] = {}
+_calls: dict[str, int] = {}
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _stages.clear()
+    for name in _calls:
+        _calls[name] = 0
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block (or decorated function) - accumulated over every call"""
+    if not _enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = _stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+        record["seconds"] += time.perf_counter() - start
+        record["calls"] += 1
+
+
+def counted(func: Callable) -> Callable:
+    """Count calls of the function. Wrapped only when instrumentation is enabled at decoration time."""
+    if not _enabled:
+        return func
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    _calls.setdefault(name, 0)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        _calls[name] += 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def summary() -> dict:
+    return {"stages": dict(_stages), "calls": dict(_calls)}
+
+
+def write_summary(path: str | Path, **extra) -> None:
+    with open(path, "w") as f:
+        json.dump({**extra, **summary()}, f, indent=2)
@@ -0,0 +1,70 @@
+"""
+Parallel evaluation of days where every line is independent (LINE_INDEPENDENT = True in the solver module).
+
+The input file is split on new line boundaries, every worker memory-maps it, solves its byte range and returns only
+the partial answer (int). Partial answers are summed.
+
+Days needing context around the range (rows above and below) define their own
+solve_byte_range(part_name, path, start, end) -> partial answer.
+
+Days with parse_buffer(buffer) get a memoryview of their range - the range is never copied nor decoded.
+
+Days reporting errors by line number (LINE_NUMBERS = True) get parse(lines, first_line_number) - number of the first
+line of the range in the whole file.
+
+Example: 4 workers, input of 1 GB
+  > 16 ranges of ~64 MB
+  > worker: parse(lines of range) -> part_one(parsed) -> partial sum
+  > sum of 16 partial sums
+"""
+
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from types import ModuleType
+
+from advent_of_code_2023.input_reader import count_lines, line_boundaries, map_file, read_mmap_lines
+
+# More ranges than workers - a slow range doesn't keep the other workers idle
+CHUNKS_PER_WORKER = 4
+
+
+def solve_range(module_name: str, part_name: str, path: str, start: int, end: int, first_line_number: int = 1) -> int:
+    """Worker - solve one byte range of the input"""
+    solver = importlib.import_module(module_name)
+    if hasattr(solver, "solve_byte_range"):
+        return solver.solve_byte_range(part_name=part_name, path=path, start=start, end=end)
+
+    if hasattr(solver, "parse_buffer"):
+        with map_file(path) as mapped, memoryview(mapped)[start:end] as view:
+            return getattr(solver, part_name)(solver.parse_buffer(view))
+
+    lines = read_mmap_lines(path, start=start, end=end)
+    if getattr(solver, "LINE_NUMBERS", False):
+        parsed = solver.parse(lines, first_line_number=first_line_number)
+    else:
+        parsed = solver.parse(lines)
+    return getattr(solver, part_name)(parsed)
+
+
+def solve_parallel(
+    solver: ModuleType, part_name: str, path: str | Path, workers: int, num_of_chunks: int | None = None
+) -> int:
+    if not getattr(solver, "LINE_INDEPENDENT", False) and not hasattr(solver, "solve_byte_range"):
+        raise ValueError(f"{solver.__name__} can't be split by lines")
+
+    ranges = line_boundaries(path, num_of_chunks=num_of_chunks or workers * CHUNKS_PER_WORKER)
+
+    # Line numbers continue across ranges - new lines of every range are counted once, in order
+    first_line_numbers = [1] * len(ranges)
+    if getattr(solver, "LINE_NUMBERS", False):
+        with map_file(path) as mapped:
+            for index, (start, end) in enumerate(ranges[:-1]):
+                first_line_numbers[index + 1] = first_line_numbers[index] + count_lines(mapped, start, end)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        partials = [
+            executor.submit(solve_range, solver.__name__, part_name, str(path), start, end, first_line_number)
+            for (start, end), first_line_number in zip(ranges, first_line_numbers)
+        ]
+        return sum(partial.result() for partial in partials)
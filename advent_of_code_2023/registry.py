@@ -0,0 +1,40 @@
+"""
+Registry of day solvers.
+
+Every day package is named `<day>_<title>` (01_trebuchet, 02_cube_conundrum...) and its `solution` module exposes:
+- parse(lines) -> parsed input
+- part_one(parsed) -> answer
+- part_two(parsed) -> answer
+
+Optionally stream_solver() -> online evaluator with feed_line(line) and totals() -> {"part one": ..., ...}.
+
+Days are discovered from package names only - a solver module is imported when it's loaded, not before.
+"""
+
+import importlib
+import pkgutil
+from types import ModuleType
+
+import advent_of_code_2023
+
+SOLUTION_MODULE = "solution"
+PARTS = {1: "part_one", 2: "part_two"}
+
+
+def discover_solvers() -> dict[int, str]:
+    """Map day number to solver module path, without importing anything"""
+    solvers = {}
+    for module_info in pkgutil.iter_modules(advent_of_code_2023.__path__):
+        day, _, _ = module_info.name.partition("_")
+        if module_info.ispkg and day.isdigit():
+            solvers[int(day)] = f"{advent_of_code_2023.__name__}.{module_info.name}.{SOLUTION_MODULE}"
+
+    return dict(sorted(solvers.items()))
+
+
+def load_solver(day: int) -> ModuleType:
+    solvers = discover_solvers()
+    if day not in solvers:
+        raise ValueError(f"No solver for day {day}, available days: {list(solvers)}")
+
+    return importlib.import_module(solvers[day])
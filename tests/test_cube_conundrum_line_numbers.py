@@ -0,0 +1,28 @@
+"""Malformed game records are reported by their line in the whole file, also when ranges are solved in parallel"""
+
+import importlib
+
+import pytest
+
+from advent_of_code_2023.input_reader import line_boundaries
+from advent_of_code_2023.parallel import solve_parallel
+
+cube_conundrum = importlib.import_module("advent_of_code_2023.02_cube_conundrum.solution")
+
+
+@pytest.mark.parametrize("bad_line_number", [1, 7, 40])
+@pytest.mark.parametrize("num_of_chunks", [1, 3, 8])
+def test_parallel_error_line_number(tmp_path, bad_line_number, num_of_chunks):
+    records = [f"Game {game_id}: 3 blue, 4 red; 1 red, 2 green" for game_id in range(1, 41)]
+    records[bad_line_number - 1] = f"Game {bad_line_number}: 3 purple"
+    path = tmp_path / "games.txt"
+    path.write_text("\n".join(records) + "\n")
+    assert len(line_boundaries(path, num_of_chunks=num_of_chunks)) == num_of_chunks
+
+    with pytest.raises(cube_conundrum.GameRecordError) as error:
+        solve_parallel(cube_conundrum, "part_one", path, workers=2, num_of_chunks=num_of_chunks)
+    assert error.value.line_number == bad_line_number
+
+    with pytest.raises(cube_conundrum.GameRecordError) as error:
+        cube_conundrum.part_one(cube_conundrum.parse(records))
+    assert error.value.line_number == bad_line_number
@@ -0,0 +1,54 @@
+"""Every evaluation path of day 2 gives a color counted twice within one set the same meaning - counts are added up"""
+
+import importlib
+
+from advent_of_code_2023.input_reader import read_lines
+
+cube_conundrum = importlib.import_module("advent_of_code_2023.02_cube_conundrum.solution")
+
+RECORDS = [
+    "Game 1: 3 red, 4 red",
+    "Game 2: 7 red; 2 green, 5 green, 1 blue",
+    "Game 3: 10 red, 3 red; 1 blue",
+    "Game 4: 1 blue, 2 blue; 6 blue, 8 blue, 1 blue; 1 green",
+]
+
+
+def test_record_maxima_equal_game_maxima():
+    for game in cube_conundrum.normalized_games(RECORDS):
+        _, maxima = cube_conundrum.game_record_maxima(RECORDS[game.game_number - 1])
+        assert maxima == game.color_maxima()
+
+    assert cube_conundrum.game_record_maxima(RECORDS[0]) == (1, [7, 0, 0])
+
+
+def test_paths_agree():
+    rules = {"red": 12, "green": 7, "blue": 14}
+    games = cube_conundrum.parse(RECORDS)
+    expected = sum(
+        game.game_number
+        for game in games
+        if not cube_conundrum.find_impossible_games([game], rules)[1]
+    )
+
+    stream = cube_conundrum.CubeGameStream(rule_sets={"rules": rules, "puzzle": cube_conundrum.BAG_RULES})
+    for record in RECORDS:
+        stream.feed_line(record)
+    assert stream.possible_id_sums["rules"] == expected
+    assert stream.possible_id_sums["puzzle"] == cube_conundrum.part_one(games)
+    assert stream.power_sum == cube_conundrum.part_two(games)
+
+    corpus = cube_conundrum.GameCorpus(RECORDS)
+    assert corpus.possible_id_sums([rules, cube_conundrum.BAG_RULES]) == [expected, cube_conundrum.part_one(games)]
+    assert list(cube_conundrum.evaluate_stream(RECORDS, {"rules": rules}))[-1] == (
+        {"rules": expected},
+        cube_conundrum.part_two(games),
+    )
+
+
+def test_puzzle_input_paths_agree():
+    games = cube_conundrum.parse(list(read_lines(cube_conundrum.INPUT_PATH)))
+    stream = cube_conundrum.stream_solver()
+    for record in read_lines(cube_conundrum.INPUT_PATH):
+        stream.feed_line(record)
+    assert stream.totals() == {"part one": cube_conundrum.part_one(games), "part two": cube_conundrum.part_two(games)}
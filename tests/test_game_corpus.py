@@ -0,0 +1,57 @@
+"""GameCorpus gives the same id sums on the cube, the sweep and the pure python path"""
+
+import importlib
+import random
+
+import pytest
+
+from advent_of_code_2023.benchmarks.generators import game_records
+
+cube_conundrum = importlib.import_module("advent_of_code_2023.02_cube_conundrum.solution")
+
+
+def expected_sums(records: list[str], rule_sets: list[dict]) -> list[int]:
+    games = [cube_conundrum.game_record_maxima(record) for record in records]
+    return [
+        sum(
+            game_number
+            for game_number, maxima in games
+            if all(maxima[cube_conundrum.COLOR_INDEX[color]] <= limit for color, limit in rules.items())
+        )
+        for rules in rule_sets
+    ]
+
+
+def random_rule_sets(rng: random.Random, count: int, max_limit: int) -> list[dict]:
+    return [
+        {color: rng.randint(0, max_limit) for color in rng.sample(cube_conundrum.COLORS, rng.randint(0, 3))}
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sweep_equals_cube(monkeypatch, seed):
+    pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    records = list(game_records(rng.randint(1, 400), max_count=rng.choice([20, 300]), seed=seed))
+    rule_sets = random_rule_sets(rng, count=rng.randint(1, 200), max_limit=300)
+    corpus = cube_conundrum.GameCorpus(records)
+
+    expected = expected_sums(records, rule_sets)
+    assert corpus.possible_id_sums(rule_sets) == expected
+
+    # Sweep for any number of levels, rule sets split to batches
+    monkeypatch.setattr(cube_conundrum.GameCorpus, "MAX_CUBE_CELLS", 0)
+    monkeypatch.setattr(cube_conundrum.GameCorpus, "RULES_BATCH", rng.randint(1, 64))
+    assert corpus.possible_id_sums(rule_sets) == expected
+
+
+def test_pure_python_path(monkeypatch):
+    monkeypatch.setattr(cube_conundrum, "load_numpy", lambda: None)
+    rng = random.Random(2023)
+    records = list(game_records(300, max_count=30, seed=1))
+    rule_sets = random_rule_sets(rng, count=50, max_limit=30)
+    corpus = cube_conundrum.GameCorpus(records)
+
+    assert not corpus.vectorized
+    assert corpus.possible_id_sums(rule_sets) == expected_sums(records, rule_sets)
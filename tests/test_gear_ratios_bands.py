@@ -0,0 +1,58 @@
+"""Banded (parallel) solving of day 3 gives the same answers as one EngineSchematic"""
+
+import importlib
+import random
+
+import pytest
+
+from advent_of_code_2023.input_reader import line_boundaries
+from advent_of_code_2023.parallel import solve_parallel
+
+gear_ratios = importlib.import_module("advent_of_code_2023.03_gear_ratios.solution")
+
+
+def random_schematic(rng: random.Random, height: int, width: int) -> list[str]:
+    """Dense rows - every row holds numbers and stars, so every band boundary cuts through some of them"""
+    rows = []
+    for _ in range(height):
+        row = []
+        while len(row) < width:
+            roll = rng.random()
+            if roll < 0.35:
+                row.extend(str(rng.randint(1, 999)))
+            elif roll < 0.55:
+                row.append("*")
+            elif roll < 0.6:
+                row.append(rng.choice("#+$/@%=&-"))
+            else:
+                row.append(".")
+        rows.append("".join(row[:width]))
+
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bands_equal_single_schematic(tmp_path, seed):
+    rng = random.Random(seed)
+    rows = random_schematic(rng, height=rng.randint(2, 40), width=rng.randint(3, 30))
+    path = tmp_path / "schematic.txt"
+    path.write_text("\n".join(rows) + "\n")
+
+    num_of_chunks = rng.randint(2, len(rows))
+    # Bands really split the schematic - boundary rows have neighbors in other bands
+    assert len(line_boundaries(path, num_of_chunks=num_of_chunks)) > 1
+
+    schematic = gear_ratios.EngineSchematic(engine_map=rows)
+    for part_name in ("part_one", "part_two"):
+        expected = getattr(gear_ratios, part_name)(schematic)
+        banded = solve_parallel(gear_ratios, part_name, path, workers=2, num_of_chunks=num_of_chunks)
+        assert banded == expected, f"{part_name}, {num_of_chunks} bands"
+
+
+def test_star_between_bands():
+    """Star on the last row of one band, numbers on the rows around it - counted exactly once"""
+    rows = ["..12..", "...*..", "..34.."]
+    # Band of rows 0-1 (halo row 2), band of row 2 (halo row 1)
+    top = gear_ratios.solve_band(rows=rows[:3], own_rows=range(0, 2), part_name="part_two")
+    bottom = gear_ratios.solve_band(rows=rows[1:], own_rows=range(1, 2), part_name="part_two")
+    assert top + bottom == gear_ratios.part_two(gear_ratios.EngineSchematic(engine_map=rows)) == 12 * 34